@@ -0,0 +1,68 @@
+import asyncio, sqlite3
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+import db
+
+# Async SQLite access for the ASGI entry point (asgi.py).
+#
+# aiosqlite runs each connection on its own thread and hands results back to
+# the event loop, so a small pool of connections serves any number of
+# waiting coroutines. Only reads go through here; writes stay on the
+# group-commit writer thread (db.GroupCommitter), which asgi.py turns on.
+
+
+async def connect(path=None):
+    conn = await aiosqlite.connect(path or db.DB_PATH, timeout=db.BUSY_TIMEOUT_MS / 1000)
+    conn.row_factory = sqlite3.Row
+    for pragma in db.PRAGMAS:
+        await conn.execute(pragma)
+    return conn
+
+
+class AsyncPool:
+
+    def __init__(self, path=None, size=db.POOL_SIZE, timeout=db.POOL_TIMEOUT):
+        self.path = path or db.DB_PATH
+        self.size = size
+        self.timeout = timeout
+        self._idle = None       # created on first use, inside the running loop
+        self._created = 0
+
+    async def acquire(self):
+        if self._idle is None:
+            self._idle = asyncio.LifoQueue()
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            try:
+                return await connect(self.path)
+            except Exception:
+                self._created -= 1
+                raise
+        try:
+            return await asyncio.wait_for(self._idle.get(), self.timeout)
+        except asyncio.TimeoutError:
+            raise db.PoolTimeout(f"no database connection free after {self.timeout}s")
+
+    async def release(self, conn):
+        if conn.in_transaction:
+            await conn.rollback()
+        self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self.acquire()
+        try:
+            yield conn
+        finally:
+            await self.release(conn)
+
+    async def close(self):
+        while self._idle is not None and not self._idle.empty():
+            await self._idle.get_nowait().close()
+        self._created = 0
+
+
+pool = AsyncPool()
+
@@ -0,0 +1,60 @@
+import zlib
+from flask import Blueprint, Response, request, jsonify
+
+import resources, versions
+from db import query_one
+
+# Read-only JSON API for ward tablets and other polling clients.
+#
+# Every response carries an ETag built from the change counters of the
+# tables behind it (table_versions). A client that sends it back in
+# If-None-Match gets 304 after one version lookup: the resource query and
+# serialization are skipped.
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+def _etag(resource):
+    stamp = '.'.join(str(v) for v in versions.many(resource.tables))
+    variant = zlib.crc32(request.full_path.encode())
+    return f'{resource.table}-{stamp}-{variant:08x}'
+
+
+def _conditional(resource, build):
+    etag = _etag(resource)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@api.route('/<path:name>/<int:key>')
+def get_one(name, key):
+    resource = resources.ALL.get(name)
+    if resource is None:
+        return jsonify(error=f"unknown resource {name!r}"), 404
+
+    def build():
+        row = query_one(f"SELECT * FROM {resource.table} WHERE {resource.key} = ?", (key,))
+        if row is None:
+            response = jsonify(error="not found")
+            response.status_code = 404
+            return response
+        return jsonify(dict(row))
+    return _conditional(resource, build)
+
+
+@api.route('/<path:name>')
+def list_all(name):
+    resource = resources.ALL.get(name)
+    if resource is None:
+        return jsonify(error=f"unknown resource {name!r}"), 404
+    return _conditional(resource, lambda: resources.page(resource).as_json())
+
+
+@api.route('/')
+def index():
+    return jsonify(resources=sorted(resources.ALL))
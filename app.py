@@ -1,154 +1,171 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
-import sqlite3, os, datetime, json
+import time
+STARTED = time.perf_counter()
+
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify
+import os, csv, datetime, json, threading
 from decimal import Decimal
 
-app = Flask(__name__)
-app.secret_key = "replace-with-a-secure-secret"
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "hospital.db")
-
-# SQLite connection (thread-safe setting for Flask dev)
-conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-conn.row_factory = sqlite3.Row
-cur = conn.cursor()
-
-# ---------- CREATE ALL REQUIRED TABLES ----------
-cur.executescript("""
-CREATE TABLE IF NOT EXISTS patients (
-    patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT,
-    age INTEGER,
-    gender TEXT,
-    phone TEXT,
-    address TEXT,
-    disease TEXT
-);
-
-CREATE TABLE IF NOT EXISTS doctors (
-    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT,
-    specialization TEXT,
-    phone TEXT,
-    email TEXT
-);
-
-CREATE TABLE IF NOT EXISTS nurses (
-    nurse_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT,
-    assigned_to INTEGER,
-    shift TEXT
-);
-
-CREATE TABLE IF NOT EXISTS medicines (
-    med_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT,
-    quantity INTEGER,
-    price REAL
-);
-
-CREATE TABLE IF NOT EXISTS facilities (
-    bed_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    room_no TEXT,
-    bed_type TEXT,
-    availability TEXT,
-    patient_id TEXT
-);
-
-CREATE TABLE IF NOT EXISTS canteen_items (
-    item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT,
-    price REAL
-);
-
-CREATE TABLE IF NOT EXISTS canteen_orders (
-    order_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    patient_id TEXT,
-    items TEXT,
-    total REAL,
-    status TEXT,
-    created_at TEXT
-);
-
-CREATE TABLE IF NOT EXISTS bills (
-    bill_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    patient_id TEXT,
-    items TEXT,
-    total REAL,
-    date TEXT
-);
-""")
-conn.commit()
-
-
-# ---------------- Helper functions ----------------
-
-def query_all(query, params=()):
-    cur.execute(query, params)
-    return cur.fetchall()
-
-def query_one(query, params=()):
-    cur.execute(query, params)
-    return cur.fetchone()
-
-def execute(query, params=()):
-    cur.execute(query, params)
-    conn.commit()
-    return cur.lastrowid
-
-
-# ✅ FIXED: dashboard_counts uses correct tables
+import click
+
+import beds, db, events, exporter, fragments, importer, metrics, migrations, resources, revenue, search, slowlog, stats
+from api import api
+from db import query_all, execute, write
+from pagination import wants_json
+from catalog import catalog
+
+# The app is built by create_app() at the bottom of this file. Routes and
+# CLI commands below are only collected here, so importing the module is
+# cheap and opens no database connection.
+routes = []
+commands = []
+
+
+def route(rule, **options):
+    def register(view):
+        routes.append((rule, view, options))
+        return view
+    return register
+
+
+def command(name):
+    def register(f):
+        cmd = click.command(name)(f)
+        commands.append(cmd)
+        return cmd
+    return register
+
+
+# ---------- Schema ----------
+# Tables and indexes are created/upgraded by the versioned steps in
+# migrations.py. `flask --app app migrate` is the one-shot way to do it
+# before starting workers; with AUTO_MIGRATE on (the default, handy in
+# development) each worker also applies anything pending before its first
+# request. With it off, a worker on an outdated schema refuses to serve.
+AUTO_MIGRATE = os.environ.get("AUTO_MIGRATE", "1") in ("1", "true", "yes")
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def ensure_schema():
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        started = time.perf_counter()
+        with db.pooled() as conn:
+            if migrations.pending(conn):
+                if not AUTO_MIGRATE:
+                    raise RuntimeError("database schema is out of date: run `flask --app app migrate`")
+                migrations.migrate(conn)
+        metrics.STARTUP_SECONDS.set(time.perf_counter() - started, 'schema')
+        _schema_ready = True
+
+
+@command("migrate")
+@click.option("--status", is_flag=True, help="Only list pending migrations.")
+def migrate_command(status):
+    """Bring hospital.db up to the latest schema version."""
+    with db.pooled() as conn:
+        if status:
+            for version, name, _ in migrations.pending(conn):
+                click.echo(f"pending {version:03d} {name}")
+        else:
+            for version, name in migrations.migrate(conn):
+                click.echo(f"applied {version:03d} {name}")
+        current = migrations.current_version(conn)
+    click.echo(f"schema version {current} (latest {migrations.latest_version()})")
+
+
+# Counters come from the trigger-maintained dashboard_stats row (stats.py)
 def dashboard_counts():
-    total_patients = query_one("SELECT COUNT(*) AS c FROM patients")["c"]
-    total_doctors = query_one("SELECT COUNT(*) AS c FROM doctors")["c"]
-    total_nurses = query_one("SELECT COUNT(*) AS c FROM nurses")["c"]
-    total_medicines = query_one("SELECT COUNT(*) AS c FROM medicines")["c"]
-    occupied_beds = query_one("SELECT COUNT(*) AS c FROM facilities WHERE availability='occupied'")["c"]
-    available_beds = query_one("SELECT COUNT(*) AS c FROM facilities WHERE availability='available'")["c"]
+    row = stats.current()
     return dict(
-        patients=total_patients,
-        doctors=total_doctors,
-        nurses=total_nurses,
-        medicines=total_medicines,
-        occupied_beds=occupied_beds,
-        available_beds=available_beds
+        patients=row["patients"],
+        doctors=row["doctors"],
+        nurses=row["nurses"],
+        medicines=row["medicines"],
+        occupied_beds=row["occupied_beds"],
+        available_beds=row["available_beds"],
+        revenue=row["revenue_paise"] / 100
     )
 
 
+@command("rebuild-stats")
+def rebuild_stats_command():
+    """Recount dashboard_stats from the base tables and report any drift."""
+    ensure_schema()
+    with db.pooled() as conn:
+        drift = stats.rebuild(conn)
+    if not drift:
+        click.echo("dashboard_stats is consistent")
+    for name, (stored, actual) in drift.items():
+        click.echo(f"{name}: {stored} -> {actual}")
+
+
 # ---------------- Routes ----------------
 
-@app.route('/')
+@route('/')
 def index():
     return render_template("index.html")
 
 
-@app.route('/dashboard')
+@route('/metrics')
+def metrics_page():
+    # Prometheus scrape target (this worker's numbers, see metrics.py)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@route('/dashboard')
 def dashboard():
     counts = dashboard_counts()
     medicine_stock = query_all("SELECT name, quantity FROM medicines ORDER BY med_id DESC LIMIT 8")
     med_labels = [r["name"] for r in medicine_stock]
     med_values = [r["quantity"] for r in medicine_stock]
 
-    total_revenue_row = query_one("SELECT SUM(total) as s FROM bills")
-    total_revenue = float(total_revenue_row["s"]) if total_revenue_row["s"] is not None else 0.0
-
     return render_template(
         "dashboard.html",
         counts=counts,
         med_labels=json.dumps(med_labels),
         med_values=json.dumps(med_values),
-        total_revenue=total_revenue
+        total_revenue=counts["revenue"]
     )
 
 
+@route('/dashboard/stream')
+def dashboard_stream():
+    # Server-Sent Events: a full snapshot on connect, then only the fields
+    # that changed. Every screen shares one publisher per worker (events.py).
+    return Response(events.broadcaster.stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 # --------- Patients -----------
-@app.route('/patients')
+@route('/patients')
 def patients():
-    data = query_all("SELECT * FROM patients ORDER BY patient_id DESC")
-    return render_template('patients.html', data=data)
+    page = resources.page(resources.PATIENTS)
+    if wants_json():
+        return page.as_json()
+    return render_template('patients.html', data=page, page=page)
+
+
+@route('/patients/search')
+def search_patients():
+    # ?q= matches name/disease/phone/address by word prefix, best first;
+    # a full phone number is looked up exactly. ?phone= forces that.
+    limit = request.args.get('limit', 20, type=int)
+    if request.args.get('phone'):
+        rows = search.by_phone(request.args['phone'].strip(), limit)
+    else:
+        rows = search.patients(request.args.get('q', ''), limit)
+    if wants_json():
+        return jsonify(rows=[dict(r) for r in rows])
+    return render_template('patients.html', data=rows, page=None, q=request.args.get('q', ''))
 
 
-@app.route('/add_patient', methods=['GET', 'POST'])
+@route('/add_patient', methods=['GET', 'POST'])
 def add_patient():
     if request.method == 'POST':
         name = request.form['name']
@@ -167,7 +184,7 @@ def add_patient():
     return render_template('add_patient.html')
 
 
-@app.route('/delete_registered_patient/<int:id>')
+@route('/delete_registered_patient/<int:id>')
 def delete_registered_patient(id):
     execute("DELETE FROM patients WHERE patient_id=?", (id,))
     flash("Patient deleted successfully", "success")
@@ -175,13 +192,25 @@ def delete_registered_patient(id):
 
 
 # --------- Doctors -----------
-@app.route('/doctors')
+@route('/doctors')
 def doctors():
-    rows = query_all("SELECT * FROM doctors ORDER BY name")
-    return render_template("doctors.html", doctors=rows)
+    if wants_json():
+        return resources.page(resources.DOCTORS).as_json()
 
+    # Table + pager are cached per query string until doctors changes
+    def build():
+        page = resources.page(resources.DOCTORS)
+        return render_template("_doctors_table.html", doctors=page, page=page)
+    table = fragments.cache.render('doctors', ('doctors',), request.query_string, build)
+    return render_template("doctors.html", table=table)
 
-@app.route('/add_doctor', methods=['GET', 'POST'])
+
+def doctor_options():
+    return fragments.cache.render('doctor_options', ('doctors',), None, lambda: render_template(
+        "_doctor_options.html", doctors=query_all("SELECT doc_id, name, specialization FROM doctors")))
+
+
+@route('/add_doctor', methods=['GET', 'POST'])
 def add_doctor():
     if request.method == 'POST':
         name = request.form['name']
@@ -190,30 +219,30 @@ def add_doctor():
         email = request.form['email']
         execute("INSERT INTO doctors (name,specialization,phone,email) VALUES (?, ?, ?, ?)",
                 (name, specialization, phone, email))
+        fragments.cache.invalidate('doctors')
         flash("Doctor added", "success")
         return redirect(url_for('doctors'))
     return render_template("add_doctor.html")
 
 
-@app.route('/doctor/<int:doc_id>/delete', methods=['POST'])
+@route('/doctor/<int:doc_id>/delete', methods=['POST'])
 def delete_doctor(doc_id):
     execute("DELETE FROM doctors WHERE doc_id = ?", (doc_id,))
+    fragments.cache.invalidate('doctors')
     flash("Doctor removed", "success")
     return redirect(url_for('doctors'))
 
 
 # --------- Nurses -----------
-@app.route('/nurses')
+@route('/nurses')
 def nurses():
-    rows = query_all("""
-        SELECT n.nurse_id, n.name, n.shift, n.assigned_to, d.name as doctor_name
-        FROM nurses n LEFT JOIN doctors d ON n.assigned_to = d.doc_id
-        ORDER BY n.name
-    """)
-    return render_template("nurses.html", nurses=rows, doctors=query_all("SELECT * FROM doctors"))
+    page = resources.page(resources.NURSES)
+    if wants_json():
+        return page.as_json()
+    return render_template("nurses.html", nurses=page, page=page)
 
 
-@app.route('/add_nurse', methods=['GET', 'POST'])
+@route('/add_nurse', methods=['GET', 'POST'])
 def add_nurse():
     if request.method == 'POST':
         name = request.form['name']
@@ -223,17 +252,19 @@ def add_nurse():
         execute("INSERT INTO nurses (name, assigned_to, shift) VALUES (?, ?, ?)", (name, assigned_to, shift))
         flash("Nurse added", "success")
         return redirect(url_for('nurses'))
-    return render_template("add_nurse.html", doctors=query_all("SELECT * FROM doctors"))
+    return render_template("add_nurse.html", doctor_options=doctor_options())
 
 
 # --------- Facilities / Beds -----------
-@app.route('/facilities')
+@route('/facilities')
 def facilities():
-    beds = query_all("SELECT * FROM facilities ORDER BY room_no, bed_id")
-    return render_template("facilities.html", beds=beds)
+    page = resources.page(resources.FACILITIES)
+    if wants_json():
+        return page.as_json()
+    return render_template("facilities.html", beds=page, page=page)
 
 
-@app.route('/add_bed', methods=['GET', 'POST'])
+@route('/add_bed', methods=['GET', 'POST'])
 def add_bed():
     if request.method == 'POST':
         room_no = request.form['room_no']
@@ -245,35 +276,66 @@ def add_bed():
     return render_template("add_bed.html")
 
 
-@app.route('/assign_bed', methods=['POST'])
+@route('/assign_bed', methods=['POST'])
 def assign_bed():
     bed_id = int(request.form['bed_id'])
     patient_id = request.form['patient_id'].strip()
-    bed = query_one("SELECT * FROM facilities WHERE bed_id = ?", (bed_id,))
-    if bed and bed['availability'] == 'available':
-        execute("UPDATE facilities SET availability=?, patient_id=? WHERE bed_id=?",
-                ('occupied', patient_id, bed_id))
+    try:
+        write(lambda cur: beds.claim(cur, bed_id, patient_id))
+    except beds.BedError as e:
+        flash(str(e), "danger")
+    else:
+        events.notify()
         flash("Bed assigned", "success")
+    return redirect(url_for('facilities'))
+
+
+@route('/allocate_beds', methods=['POST'])
+def allocate_beds():
+    # Surge intake: one bed of the given type per patient, all in one
+    # transaction. Accepts the facilities form or a JSON body
+    # {"bed_type": ..., "patient_ids": [...], "partial": false}.
+    if request.is_json:
+        body = request.get_json()
+        bed_type = body.get('bed_type', '')
+        patient_ids = [str(p).strip() for p in body.get('patient_ids', [])]
+        partial = bool(body.get('partial'))
     else:
-        flash("Bed not available", "danger")
+        bed_type = request.form['bed_type'].strip()
+        patient_ids = [p.strip() for p in request.form['patient_ids'].splitlines()]
+        partial = bool(request.form.get('partial'))
+    try:
+        assigned = write(lambda cur: beds.allocate(cur, bed_type, patient_ids, partial))
+    except beds.BedError as e:
+        if request.is_json:
+            return jsonify(error=str(e)), 409
+        flash(str(e), "danger")
+        return redirect(url_for('facilities'))
+    events.notify()
+    if request.is_json:
+        return jsonify(assigned=[dict(patient_id=p, bed_id=b, room_no=r) for p, b, r in assigned])
+    flash(f"Assigned {len(assigned)} bed(s)", "success")
     return redirect(url_for('facilities'))
 
 
-@app.route('/release_bed/<int:bed_id>', methods=['POST'])
+@route('/release_bed/<int:bed_id>', methods=['POST'])
 def release_bed(bed_id):
-    execute("UPDATE facilities SET availability='available', patient_id=NULL WHERE bed_id=?", (bed_id,))
+    write(lambda cur: beds.release(cur, bed_id))
+    events.notify()
     flash("Bed released", "success")
     return redirect(url_for('facilities'))
 
 
 # --------- Pharmacy / Medicines -----------
-@app.route('/pharmacy')
+@route('/pharmacy')
 def pharmacy():
-    meds = query_all("SELECT * FROM medicines ORDER BY name")
-    return render_template("pharmacy.html", medicines=meds)
+    page = resources.page(resources.MEDICINES)
+    if wants_json():
+        return page.as_json()
+    return render_template("pharmacy.html", medicines=page, page=page)
 
 
-@app.route('/add_medicine', methods=['GET', 'POST'])
+@route('/add_medicine', methods=['GET', 'POST'])
 def add_medicine():
     if request.method == 'POST':
         name = request.form['name']
@@ -285,105 +347,299 @@ def add_medicine():
     return render_template("add_medicine.html")
 
 
-@app.route('/buy_medicine', methods=['POST'])
+class StockError(Exception):
+    pass
+
+
+def dispense(cur, med_id, qty):
+    # Stock check and decrement are one conditional UPDATE, so two counters
+    # selling the last units at the same time can't both succeed.
+    if qty <= 0:
+        raise StockError("Invalid quantity")
+    cur.execute("UPDATE medicines SET quantity = quantity - ? WHERE med_id = ? AND quantity >= ?",
+                (qty, med_id, qty))
+    updated = cur.rowcount
+    med = cur.execute("SELECT name, price FROM medicines WHERE med_id = ?", (med_id,)).fetchone()
+    if not med:
+        raise StockError("Medicine not found")
+    if not updated:
+        raise StockError(f"Insufficient stock for {med['name']}")
+    amount = float(med['price']) * qty
+    return dict(desc=f"Medicine: {med['name']} x{qty}", amount=amount,
+                item=med['name'], item_id=med_id, qty=qty)
+
+
+def insert_bill(cur, patient_id, lines, source):
+    # bills.items keeps its original {desc, amount} JSON; the line items
+    # themselves go to bill_lines for reporting.
+    total = sum(l['amount'] for l in lines)
+    now = datetime.datetime.now().isoformat()
+    cur.execute("INSERT INTO bills (patient_id, items, total, date) VALUES (?, ?, ?, ?)",
+                (patient_id, json.dumps([dict(desc=l['desc'], amount=l['amount']) for l in lines]), total, now))
+    bill_id = cur.lastrowid
+    cur.executemany(revenue.INSERT_LINE, revenue.bill_line_rows(bill_id, source, lines, now[:10]))
+    return bill_id
+
+
+@route('/buy_medicine', methods=['POST'])
 def buy_medicine():
     med_id = int(request.form['med_id'])
     qty = int(request.form['quantity'])
-    med = query_one("SELECT * FROM medicines WHERE med_id = ?", (med_id,))
-    if not med:
-        flash("Medicine not found", "danger")
+    try:
+        write(lambda cur: insert_bill(cur, 'store', [dispense(cur, med_id, qty)], 'pharmacy'))
+    except StockError as e:
+        flash(str(e), "danger")
     else:
-        if med['quantity'] >= qty:
-            new_qty = med['quantity'] - qty
-            execute("UPDATE medicines SET quantity=? WHERE med_id=?", (new_qty, med_id))
-            desc = f"Medicine: {med['name']} x{qty}"
-            amount = float(med['price']) * qty
-            execute("INSERT INTO bills (patient_id, items, total, date) VALUES (?, ?, ?, ?)",
-                    ('store', json.dumps([dict(desc=desc, amount=amount)]),
-                     amount, datetime.datetime.now().isoformat()))
-            flash("Medicine purchased", "success")
-        else:
-            flash("Insufficient stock", "danger")
+        events.notify()
+        flash("Medicine purchased", "success")
+    return redirect(url_for('pharmacy'))
+
+
+@route('/pharmacy/checkout', methods=['POST'])
+def checkout_medicines():
+    # Cart sale: every line is dispensed and billed in one transaction;
+    # any shortfall rolls the whole cart back.
+    patient_id = request.form.get('patient_id', '').strip() or 'store'
+    cart = {}
+    for k, v in request.form.items():
+        if k.startswith('qty_') and v and int(v) > 0:
+            cart[int(k.split('_', 1)[1])] = int(v)
+    if not cart:
+        flash("Cart is empty", "danger")
+        return redirect(url_for('pharmacy'))
+
+    def sell(cur):
+        lines = [dispense(cur, med_id, qty) for med_id, qty in sorted(cart.items())]
+        insert_bill(cur, patient_id, lines, 'pharmacy')
+        return lines
+
+    try:
+        lines = write(sell)
+    except StockError as e:
+        flash(f"{e} — nothing was dispensed", "danger")
+    else:
+        events.notify()
+        flash(f"Dispensed {len(lines)} medicine(s)", "success")
     return redirect(url_for('pharmacy'))
 
 
 # --------- Canteen (Food ordering) -----------
-@app.route('/canteen')
+@route('/canteen')
 def canteen():
-    items = query_all("SELECT * FROM canteen_items ORDER BY name")
     recent_orders = query_all("SELECT * FROM canteen_orders ORDER BY created_at DESC LIMIT 10")
-    return render_template("canteen.html", items=items, orders=recent_orders)
+    return render_template("canteen.html", orders=recent_orders)
 
 
-@app.route('/add_canteen_item', methods=['POST'])
+@route('/add_canteen_item', methods=['POST'])
 def add_canteen_item():
     name = request.form['name']
     price = float(request.form['price'])
     execute("INSERT INTO canteen_items (name, price) VALUES (?, ?)", (name, price))
+    catalog.invalidate()
+    fragments.cache.invalidate('canteen_items')
     flash("Canteen item added", "success")
     return redirect(url_for('canteen'))
 
 
-@app.route('/order_food', methods=['GET', 'POST'])
+@route('/order_food', methods=['GET', 'POST'])
 def order_food():
     if request.method == 'POST':
         patient_id = request.form['patient_id']
-        items = []
-        total = 0.0
+        basket = {}
         for k, v in request.form.items():
             if k.startswith('item_') and v and int(v) > 0:
-                item_id = int(k.split('_', 1)[1])
-                qty = int(v)
-                item_row = query_one("SELECT * FROM canteen_items WHERE item_id = ?", (item_id,))
-                if item_row:
-                    subtotal = float(item_row['price']) * qty
-                    items.append(dict(item_id=item_id, name=item_row['name'], qty=qty,
-                                      price=float(item_row['price']), subtotal=subtotal))
-                    total += subtotal
+                basket[int(k.split('_', 1)[1])] = int(v)
+        # One catalog lookup for the whole basket instead of a query per item
+        known = catalog.lookup(basket) if basket else {}
+        items = []
+        total = 0.0
+        for item_id, qty in basket.items():
+            item_row = known.get(item_id)
+            if item_row:
+                subtotal = float(item_row['price']) * qty
+                items.append(dict(item_id=item_id, name=item_row['name'], qty=qty,
+                                  price=float(item_row['price']), subtotal=subtotal))
+                total += subtotal
         if not items:
             flash("No items selected", "danger")
             return redirect(url_for('canteen'))
-        execute("INSERT INTO canteen_orders (patient_id, items, total, status, created_at) VALUES (?, ?, ?, ?, ?)",
-                (patient_id, json.dumps(items), total, 'placed', datetime.datetime.now().isoformat()))
+        now = datetime.datetime.now().isoformat()
+
+        def place(cur):
+            cur.execute("INSERT INTO canteen_orders (patient_id, items, total, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                        (patient_id, json.dumps(items), total, 'placed', now))
+            cur.executemany(revenue.INSERT_LINE, revenue.order_line_rows(cur.lastrowid, items, now[:10]))
+        write(place)
         flash("Order placed", "success")
         return redirect(url_for('canteen'))
-    items = query_all("SELECT * FROM canteen_items ORDER BY name")
-    return render_template("order_food.html", items=items)
+    menu = fragments.cache.render('menu', ('canteen_items',), None, lambda: render_template(
+        "_menu.html", items=query_all("SELECT * FROM canteen_items ORDER BY name")))
+    return render_template("order_food.html", menu=menu)
 
 
 # --------- Billing -----------
-@app.route('/billing', methods=['GET', 'POST'])
+@route('/billing', methods=['GET', 'POST'])
 def billing():
     if request.method == 'POST':
         patient_id = request.form['patient_id']
         lines = []
-        total = 0.0
         n = int(request.form.get('line_count', '0'))
         for i in range(1, n + 1):
             desc = request.form.get(f'desc_{i}')
             amt = float(request.form.get(f'amt_{i}', '0'))
             if desc and amt:
                 lines.append(dict(desc=desc, amount=amt))
-                total += amt
-        execute("INSERT INTO bills (patient_id, items, total, date) VALUES (?, ?, ?, ?)",
-                (patient_id, json.dumps(lines), total, datetime.datetime.now().isoformat()))
+        write(lambda cur: insert_bill(cur, patient_id, lines, 'billing'))
+        events.notify()
         flash("Bill generated", "success")
         return redirect(url_for('dashboard'))
     patients = query_all("SELECT patient_id, name FROM patients ORDER BY name")
     return render_template("billing.html", patients=patients)
 
 
+# --------- Revenue reports -----------
+@route('/reports/revenue/<group>')
+def revenue_report(group):
+    # /reports/revenue/day|source|item?from=YYYY-MM-DD&to=YYYY-MM-DD&source=canteen
+    try:
+        start = exporter.parse_day(request.args.get('from'), 'from')
+        end = exporter.parse_day(request.args.get('to'), 'to')
+    except exporter.ExportFailed as e:
+        return jsonify(error=str(e)), 400
+    source = request.args.get('source') or None
+    if source and source not in revenue.SOURCES:
+        return jsonify(error=f"source must be one of {', '.join(revenue.SOURCES)}"), 400
+    if group == 'day':
+        rows = revenue.by_day(start, end, source)
+    elif group == 'source':
+        rows = revenue.by_source(start, end)
+    elif group == 'item':
+        rows = revenue.by_item(start, end, source, max(1, min(request.args.get('limit', 50, type=int), 500)))
+    else:
+        return jsonify(error="group by day, source or item"), 404
+    return jsonify(rows=[dict(r) for r in rows])
+
+
+# --------- Bulk import -----------
+@route('/import/<kind>', methods=['POST'])
+def import_rows(kind):
+    # Upload as multipart field "file", or send the CSV/JSONL as the raw
+    # request body (?format=jsonl or Content-Type application/x-ndjson).
+    upload = request.files.get('file')
+    if upload:
+        stream, filename = upload.stream, upload.filename
+    else:
+        stream, filename = request.stream, None
+    fmt = request.args.get('format')
+    if not fmt and not upload and request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        fmt = 'jsonl'
+    try:
+        report = importer.run(db.get_db(), kind, stream, importer.detect_format(filename, fmt))
+    except importer.ImportFailed as e:
+        return jsonify(error=str(e)), 400
+    fragments.cache.clear()
+    return jsonify(report)
+
+
+@command("import-data")
+@click.argument("kind", type=click.Choice(sorted(importer.KINDS)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Defaults to the file extension.")
+@click.option("--chunk-size", default=importer.CHUNK_SIZE, show_default=True)
+@click.option("--rejects", type=click.Path(dir_okay=False), help="Write rejected rows to this CSV file.")
+def import_data_command(kind, path, fmt, chunk_size, rejects):
+    """Bulk-load patients, medicines, beds or canteen items from CSV/JSONL."""
+    ensure_schema()
+    rejects_file = open(rejects, 'w', newline='') if rejects else None
+    on_reject = None
+    if rejects_file:
+        writer = csv.writer(rejects_file)
+        writer.writerow(['line', 'error', 'row'])
+        on_reject = lambda line, row, error: writer.writerow([line, error, json.dumps(row)])
+    try:
+        with open(path, 'rb') as f, db.pooled() as conn:
+            report = importer.run(conn, kind, f, importer.detect_format(path, fmt), chunk_size, on_reject)
+    except importer.ImportFailed as e:
+        raise click.ClickException(str(e))
+    finally:
+        if rejects_file:
+            rejects_file.close()
+    click.echo(f"{report['accepted']} imported, {report['rejected']} rejected "
+               f"in {report['seconds']}s ({report['rows_per_sec']} rows/s)")
+    for r in report['rejects'][:20]:
+        click.echo(f"  line {r['line']}: {r['error']}")
+
+
+# --------- Export -----------
+@route('/export/<kind>.<fmt>')
+def export_rows(kind, fmt):
+    # e.g. /export/bills.csv?from=2025-01-01&to=2025-01-31&gzip=1
+    try:
+        start = exporter.parse_day(request.args.get('from'), 'from')
+        end = exporter.parse_day(request.args.get('to'), 'to')
+        gz = request.args.get('gzip') in ('1', 'true', 'yes')
+        chunks = exporter.stream(kind, fmt, start, end, gz)
+    except exporter.ExportFailed as e:
+        return jsonify(error=str(e)), 400
+    mimetype, headers = exporter.headers(kind, fmt, gz)
+    return Response(chunks, mimetype=mimetype, headers=headers)
+
+
 # -------------- Utility routes ------------
-@app.route('/reset-demo', methods=['POST'])
+@route('/admin/slow-queries')
+def slow_queries():
+    queries = slowlog.worst()
+    if wants_json():
+        return jsonify(queries=[dict(q, callers=list(q['callers'])) for q in queries])
+    return render_template("slow_queries.html", queries=queries, threshold_ms=slowlog.SLOW_QUERY_MS)
+
+
+@route('/admin/slow-queries/reset', methods=['POST'])
+def reset_slow_queries():
+    slowlog.reset()
+    flash("Slow-query log cleared", "success")
+    return redirect(url_for('slow_queries'))
+
+
+@route('/reset-demo', methods=['POST'])
 def reset_demo():
     tables = ['patients', 'doctors', 'nurses', 'medicines', 'facilities',
-              'canteen_items', 'canteen_orders', 'bills']
+              'canteen_items', 'canteen_orders', 'bills', 'bill_lines']
     for t in tables:
         execute(f"DELETE FROM {t}")
+    fragments.cache.clear()
     flash("Demo data cleared", "success")
     return redirect(url_for('dashboard'))
 
 
+# -------------- App factory ------------
+def create_app():
+    started = time.perf_counter()
+    app = Flask(__name__)
+    app.secret_key = "replace-with-a-secure-secret"
+
+    # Every request borrows its own pooled connection + cursor (see db.py).
+    # Nothing is opened here: pools fill lazily in each worker, after any
+    # fork (db.py also resets them in forked children).
+    db.init_app(app)
+    metrics.init_app(app)
+    app.before_request(ensure_schema)
+    app.register_blueprint(api)
+    for rule, view, options in routes:
+        app.add_url_rule(rule, view_func=view, **options)
+    for cmd in commands:
+        app.cli.add_command(cmd)
+
+    now = time.perf_counter()
+    metrics.STARTUP_SECONDS.set(started - STARTED, 'import')
+    metrics.STARTUP_SECONDS.set(now - started, 'create_app')
+    return app
+
+
+# gunicorn app:app / flask --app app
+app = create_app()
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
     app.run(debug=False, host="0.0.0.0", port=port)
@@ -0,0 +1,301 @@
+import asyncio, io, json, os
+from urllib.parse import parse_qs
+
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from quart import Quart, Response, jsonify, request
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+import adb, db, events, exporter, fragments, importer
+from app import app as flask_app, ensure_schema
+
+# ASGI entry point:  hypercorn asgi:application
+#
+# The long-lived responses -- the dashboard SSE feed and streaming exports --
+# are served by async Quart routes on the event loop, so an idle or
+# streaming client costs a coroutine instead of a worker thread. Every other
+# path goes to the regular Flask app (same routes and templates), run on
+# the server's thread pool. All writes are funnelled into the group-commit
+# writer thread. `gunicorn app:app` keeps working unchanged.
+#
+# Bulk imports (POST /import/<kind>) skip the bridge too, which would buffer
+# the whole upload and refuse anything over MAX_BODY: the importer runs in a
+# worker thread and pulls the body off the connection as it goes.
+
+MAX_BODY = int(os.environ.get("ASGI_MAX_BODY", str(64 * 1024 * 1024)))   # bridged uploads are buffered
+MAX_EXPORTS = int(os.environ.get("ASGI_MAX_EXPORTS", "16"))
+READ_SIZE = 64 * 1024
+ASYNC_PATHS = ('/dashboard/stream', '/export/')
+
+if db.writer is None:
+    db.writer = db.GroupCommitter()
+
+async_app = Quart(__name__)
+async_app.config['RESPONSE_TIMEOUT'] = None
+
+
+class AsyncBroadcaster:
+    # asyncio twin of events.Broadcaster: one publisher task per process
+    # feeds every open dashboard, sharing the same events.Feed logic.
+
+    def __init__(self):
+        self._feed = events.Feed()
+        self._task = None
+        self._loop = None
+        self._subscribers = 0
+
+    def notify(self):
+        # May be called from any thread (Flask routes call events.notify())
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def _start(self):
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._cond = asyncio.Condition()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            if self.notify not in events.listeners:
+                events.listeners.append(self.notify)
+
+    async def _run(self):
+        seen = None
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), None if self._subscribers == 0 else events.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                async with adb.pool.connection() as conn:
+                    stamp = tuple(r[0] for r in await conn.execute_fetchall(events.VERSION_STAMP, events.WATCHED))
+                    if stamp == seen and self._feed.state is not None:
+                        continue
+                    stats = await conn.execute_fetchall(events.SNAPSHOT_STATS)
+                    meds = await conn.execute_fetchall(events.SNAPSHOT_MEDS)
+            except Exception:
+                # e.g. locked during a migration; try again on the next tick
+                continue
+            seen = stamp
+            async with self._cond:
+                if self._feed.publish(events.build_snapshot(stats[0], meds)):
+                    self._cond.notify_all()
+
+    async def stream(self):
+        feed = self._feed
+        self._start()
+        self._subscribers += 1
+        self._wake.set()
+        try:
+            async with self._cond:
+                try:
+                    await asyncio.wait_for(self._cond.wait_for(lambda: feed.state is not None), events.KEEPALIVE)
+                except asyncio.TimeoutError:
+                    pass
+                seq, state = feed.seq, feed.state
+            yield b"retry: 3000\n\n"
+            if state is not None:
+                yield events.format_event("snapshot", state).encode()
+            while True:
+                async with self._cond:
+                    try:
+                        await asyncio.wait_for(self._cond.wait_for(lambda: feed.seq > seq), events.KEEPALIVE)
+                    except asyncio.TimeoutError:
+                        pass
+                    out = feed.since(seq)
+                    seq = feed.seq
+                yield out.encode()
+        finally:
+            self._subscribers -= 1
+
+
+broadcaster = AsyncBroadcaster()
+
+# Like the WSGI exporter, each export reads on its own connection rather
+# than holding a pooled one (and starving the dashboard feed) for its whole
+# length. At most MAX_EXPORTS run at once; the rest wait for a turn before
+# their first byte instead of failing half-way through.
+export_slots = asyncio.Semaphore(MAX_EXPORTS)
+
+
+@async_app.route('/dashboard/stream')
+async def dashboard_stream():
+    response = Response(broadcaster.stream(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.timeout = None
+    return response
+
+
+@async_app.route('/export/<kind>.<fmt>')
+async def export_rows(kind, fmt):
+    try:
+        start = exporter.parse_day(request.args.get('from'), 'from')
+        end = exporter.parse_day(request.args.get('to'), 'to')
+        gz = request.args.get('gzip') in ('1', 'true', 'yes')
+        exporter.check_format(fmt)
+        sql, params = exporter.build_query(kind, start, end)
+    except exporter.ExportFailed as e:
+        return jsonify(error=str(e)), 400
+
+    async def body():
+        async with export_slots:
+            conn = await adb.connect()
+            try:
+                async with conn.execute(sql, params) as cur:
+                    encoder = exporter.Encoder([d[0] for d in cur.description], fmt, gz)
+                    chunk = encoder.header()
+                    while True:
+                        if chunk:
+                            yield chunk
+                        batch = await cur.fetchmany(exporter.BATCH_SIZE)
+                        if not batch:
+                            break
+                        chunk = encoder.batch(batch)
+                    tail = encoder.finish()
+                    if tail:
+                        yield tail
+            finally:
+                await conn.close()
+
+    mimetype, headers = exporter.headers(kind, fmt, gz)
+    response = Response(body(), mimetype=mimetype, headers=headers)
+    response.timeout = None
+    return response
+
+
+class UploadStream(io.RawIOBase):
+    # Blocking file object over an ASGI request body, for a worker thread.
+    # Each read waits for the next body message on the event loop, so the
+    # upload arrives no faster than the importer consumes it.
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = b""
+        self._more = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer and self._more:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                raise importer.ImportFailed("client disconnected during upload")
+            self._buffer = message.get('body', b"")
+            self._more = message.get('more_body', False)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+class UploadedFile(io.RawIOBase):
+    # The multipart field "file" of an UploadStream, decoded as it arrives;
+    # every other field is skipped. filename stays None if there is none.
+
+    def __init__(self, raw, boundary):
+        self._raw = raw
+        self._decoder = MultipartDecoder(boundary)
+        self._in_file = False
+        self._done = False
+        self.filename = None
+        self._buffer = self._next()
+
+    def readable(self):
+        return True
+
+    def _next(self):
+        # Next chunk of the "file" part, b"" once it is over
+        while not self._done:
+            try:
+                event = self._decoder.next_event()
+            except ValueError as e:
+                raise importer.ImportFailed(f"malformed multipart upload: {e}")
+            if isinstance(event, NeedData):
+                self._decoder.receive_data(self._raw.read(READ_SIZE) or None)
+            elif isinstance(event, (File, Field)):
+                self._in_file = isinstance(event, File) and event.name == 'file'
+                if self._in_file:
+                    self.filename = event.filename
+            elif isinstance(event, Data):
+                if self._in_file:
+                    self._done = not event.more_data
+                    return event.data
+            elif isinstance(event, Epilogue):
+                self._done = True
+        return b""
+
+    def readinto(self, b):
+        while not self._buffer and not self._done:
+            self._buffer = self._next()
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+async def send_json(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def import_rows(scope, receive, send):
+    # Same contract as the Flask route: multipart field "file", or the
+    # CSV/JSONL as the raw body (?format=jsonl or an ndjson Content-Type).
+    if scope['method'] != 'POST':
+        return await send_json(send, 405, dict(error="method not allowed"))
+    kind = scope['path'][len('/import/'):]
+    args = parse_qs(scope['query_string'].decode('latin-1'))
+    fmt = args.get('format', [None])[0]
+    headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+    mimetype, options = parse_options_header(headers.get('content-type', ''))
+    loop = asyncio.get_running_loop()
+
+    def work():
+        stream, filename = UploadStream(receive, loop), None
+        if mimetype == 'multipart/form-data':
+            stream = UploadedFile(stream, options.get('boundary', '').encode('latin-1'))
+            if stream.filename is None:
+                raise importer.ImportFailed("no multipart field named 'file'")
+            filename = stream.filename
+        elif not fmt and mimetype in ('application/x-ndjson', 'application/jsonl'):
+            filename = 'upload.jsonl'
+        with db.pooled() as conn:
+            return importer.run(conn, kind, io.BufferedReader(stream, READ_SIZE),
+                                importer.detect_format(filename, fmt))
+
+    try:
+        report = await asyncio.to_thread(work)
+    except importer.ImportFailed as e:
+        return await send_json(send, 400, dict(error=str(e)))
+    except (db.PoolTimeout, db.WriterUnavailable) as e:
+        return await send_json(send, 503, dict(error=str(e)))
+    fragments.cache.clear()
+    await send_json(send, 200, report)
+
+
+@async_app.before_serving
+async def prepare_schema():
+    # The async routes bypass Flask's before_request hook
+    await asyncio.to_thread(ensure_schema)
+
+
+@async_app.after_serving
+async def close_pool():
+    await adb.pool.close()
+
+
+wsgi = AsyncioWSGIMiddleware(flask_app, max_body_size=MAX_BODY)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan' or scope.get('path', '').startswith(ASYNC_PATHS):
+        await async_app(scope, receive, send)
+    elif scope['type'] == 'http' and scope['path'].startswith('/import/'):
+        await import_rows(scope, receive, send)
+    else:
+        await wsgi(scope, receive, send)
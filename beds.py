@@ -0,0 +1,50 @@
+# Bed allocation engine. Claims are compare-and-swap updates: a bed only
+# changes hands if it is still 'available' at the moment of the UPDATE, so
+# two clerks can never be given the same bed.
+
+CLAIM = ("UPDATE facilities SET availability='occupied', patient_id=? "
+         "WHERE bed_id=? AND availability='available'")
+
+
+class BedError(Exception):
+    pass
+
+
+def claim(cur, bed_id, patient_id):
+    cur.execute(CLAIM, (patient_id, bed_id))
+    if not cur.rowcount:
+        raise BedError("Bed not available")
+
+
+def release(cur, bed_id):
+    cur.execute("UPDATE facilities SET availability='available', patient_id=NULL WHERE bed_id=?", (bed_id,))
+
+
+def allocate(cur, bed_type, patient_ids, partial=False):
+    # Assign one free bed of `bed_type` to each patient, filling rooms in
+    # order. Must run inside a write transaction; free beds come straight
+    # off idx_facilities_free (availability, bed_type, room_no).
+    # Returns [(patient_id, bed_id, room_no)].
+    # A patient listed twice still gets one bed, and one who already has a
+    # bed gets no second one (skipped when partial, otherwise an error)
+    patient_ids = list(dict.fromkeys(p for p in patient_ids if p))
+    if not patient_ids:
+        raise BedError("No patients given")
+    holding = {r[0] for r in cur.execute(
+        "SELECT patient_id FROM facilities WHERE availability='occupied' AND patient_id IN (%s)"
+        % ",".join("?" * len(patient_ids)), patient_ids).fetchall()}
+    if holding and not partial:
+        raise BedError(f"Already in a bed: {', '.join(p for p in patient_ids if p in holding)}")
+    patient_ids = [p for p in patient_ids if p not in holding]
+    if not patient_ids:
+        raise BedError("Every patient given already has a bed")
+    free = cur.execute(
+        "SELECT bed_id, room_no FROM facilities WHERE availability='available' AND bed_type=? "
+        "ORDER BY room_no LIMIT ?", (bed_type, len(patient_ids))).fetchall()
+    if len(free) < len(patient_ids) and not partial:
+        raise BedError(f"Only {len(free)} free {bed_type} bed(s) for {len(patient_ids)} patient(s)")
+    pairs = list(zip(patient_ids, free))
+    cur.executemany(CLAIM, [(p, bed['bed_id']) for p, bed in pairs])
+    if cur.rowcount != len(pairs):
+        raise BedError("Beds changed during allocation, please retry")
+    return [(p, bed['bed_id'], bed['room_no']) for p, bed in pairs]
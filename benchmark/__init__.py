@@ -0,0 +1,3 @@
+# Benchmark tooling for app.py:
+#   python -m benchmark.datagen  -- fill a database with seeded synthetic data
+#   python -m benchmark.loadtest -- drive the routes with concurrent clients
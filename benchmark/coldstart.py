@@ -0,0 +1,60 @@
+import argparse, json, os, statistics, subprocess, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Worker cold-start timing. Each run is a fresh interpreter that imports
+# app.py (which builds the app through create_app()) and serves its first
+# request, the same work a new gunicorn worker does without --preload.
+# Phases come from the worker_startup_seconds gauge app.py records.
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import app, metrics
+imported = time.perf_counter()
+app.app.test_client().get('/dashboard')
+served = time.perf_counter()
+phases = {labels[0]: value for labels, value in metrics.STARTUP_SECONDS._values.items()}
+phases.update(import_total=imported - started, first_request=served - imported)
+print(json.dumps(phases))
+"""
+
+
+def run_once(env):
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    phases = json.loads(out.strip().splitlines()[-1])
+    phases['process_total'] = time.perf_counter() - started
+    return phases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app.py worker cold start.")
+    parser.add_argument('--db', help="database to use (default: HOSPITAL_DB or hospital.db)")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--out', help="also save the results as JSON")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    if args.db:
+        env['HOSPITAL_DB'] = os.path.abspath(args.db)
+    run_once(env)   # first run may migrate a fresh database; not counted
+    runs = [run_once(env) for _ in range(args.runs)]
+
+    results = {}
+    print(f"{'phase':14} {'median':>9} {'max':>9}  (ms, {args.runs} runs)")
+    for phase in ('import', 'create_app', 'import_total', 'schema', 'first_request', 'process_total'):
+        values = [r[phase] for r in runs if phase in r]
+        if not values:
+            continue
+        results[phase] = dict(median_ms=round(statistics.median(values) * 1000, 1),
+                              max_ms=round(max(values) * 1000, 1))
+        print(f"{phase:14} {results[phase]['median_ms']:>9} {results[phase]['max_ms']:>9}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(dict(runs=args.runs, phases=results), f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+import argparse, datetime, json, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db, migrations, revenue
+
+# Seeded synthetic data for every table in the app's schema. The same seed
+# and scale always produce the same database, so runs are comparable.
+
+FIRST = ['Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Isha', 'Kabir', 'Meera', 'Rohan', 'Saanvi',
+         'Arjun', 'Priya', 'Rahul', 'Sneha', 'Vikram', 'Kavya', 'Farhan', 'Neha', 'Ishaan', 'Pooja']
+LAST = ['Sharma', 'Verma', 'Gupta', 'Iyer', 'Reddy', 'Khan', 'Singh', 'Patel', 'Nair', 'Das',
+        'Mehta', 'Joshi', 'Kapoor', 'Rao', 'Bose']
+DISEASES = ['Fever', 'Dengue', 'Typhoid', 'Fracture', 'Asthma', 'Diabetes', 'Malaria', 'Migraine',
+            'Hypertension', 'Bronchitis', 'Jaundice', 'Covid-19']
+CITIES = ['Delhi', 'Mumbai', 'Pune', 'Chennai', 'Kolkata', 'Jaipur', 'Lucknow', 'Bhopal']
+SPECIALIZATIONS = ['Cardiologist', 'Rheumatologist', 'Psychiatrist', 'Neurologist', 'Otolaryngologist',
+                   'Orthopedic', 'Pediatrician', 'General Physician']
+MEDICINES = ['Paracetamol', 'Ibuprofen', 'Amoxicillin', 'Cetirizine', 'Metformin', 'Azithromycin',
+             'Omeprazole', 'Atorvastatin', 'Amlodipine', 'Insulin', 'Pantoprazole', 'Dolo']
+FOODS = ['Tea', 'Coffee', 'Idli', 'Dosa', 'Poha', 'Upma', 'Khichdi', 'Dal Rice', 'Roti Sabzi', 'Soup',
+         'Fruit Bowl', 'Juice', 'Sandwich', 'Paratha', 'Curd Rice']
+SHIFTS = ['Morning', 'Evening', 'Night']
+BED_TYPES = ['General', 'General', 'General', 'Semi-Private', 'VIP', 'ICU']
+
+CHUNK = 10000
+
+
+def counts_for(scale):
+    # Table sizes derived from the patient count; each can be overridden.
+    doctors = max(10, scale // 200)
+    return dict(
+        patients=scale,
+        doctors=doctors,
+        nurses=doctors * 2,
+        medicines=max(50, min(5000, scale // 100)),
+        beds=max(20, scale // 20),
+        canteen_items=len(FOODS),
+        canteen_orders=scale,
+        bills=scale,
+    )
+
+
+def _chunks(rows, size=CHUNK):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load(conn, sql, rows):
+    n = 0
+    for batch in _chunks(rows):
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(sql, batch)
+        conn.commit()
+        n += len(batch)
+    return n
+
+
+# Bills and orders are dated back from a fixed day, not from now, so the
+# same seed gives the same rows whenever it is run
+UNTIL = '2026-01-01'
+
+
+def _stamp(rng, days, until):
+    moment = until - datetime.timedelta(seconds=rng.randrange(days * 86400))
+    return moment.isoformat()
+
+
+def generate(conn, counts, seed=42, days=365, until=UNTIL):
+    until = datetime.datetime.fromisoformat(until)
+    rng = random.Random(seed)
+    timings = {}
+
+    def timed(name, sql, rows):
+        started = time.perf_counter()
+        n = _load(conn, sql, rows)
+        timings[name] = dict(rows=n, seconds=round(time.perf_counter() - started, 2))
+
+    timed('patients', "INSERT INTO patients (name, age, gender, phone, address, disease) VALUES (?, ?, ?, ?, ?, ?)",
+          ((f"{rng.choice(FIRST)} {rng.choice(LAST)}", rng.randint(1, 95), rng.choice(['Male', 'Female', 'Other']),
+            str(6000000000 + rng.randrange(3999999999)), f"{rng.randint(1, 999)} {rng.choice(CITIES)}",
+            rng.choice(DISEASES)) for _ in range(counts['patients'])))
+    timed('doctors', "INSERT INTO doctors (name, specialization, phone, email) VALUES (?, ?, ?, ?)",
+          ((f"Dr. {rng.choice(FIRST)} {rng.choice(LAST)}", rng.choice(SPECIALIZATIONS),
+            str(9000000000 + i), f"doctor{i}@medcare.example") for i in range(counts['doctors'])))
+    timed('nurses', "INSERT INTO nurses (name, assigned_to, shift) VALUES (?, ?, ?)",
+          ((f"{rng.choice(FIRST)} {rng.choice(LAST)}", rng.randint(1, counts['doctors']), rng.choice(SHIFTS))
+           for _ in range(counts['nurses'])))
+    timed('medicines', "INSERT INTO medicines (name, quantity, price) VALUES (?, ?, ?)",
+          ((f"{rng.choice(MEDICINES)} {rng.choice([100, 250, 500, 650])}mg #{i}", rng.randint(10000, 1000000),
+            round(rng.uniform(2, 500), 2)) for i in range(counts['medicines'])))
+    timed('beds', "INSERT INTO facilities (room_no, bed_type, availability, patient_id) VALUES (?, ?, ?, ?)",
+          ((f"{100 + i // 4}", rng.choice(BED_TYPES), *(('occupied', str(rng.randint(1, max(1, counts['patients']))))
+                                                       if rng.random() < 0.6 else ('available', None)))
+           for i in range(counts['beds'])))
+    timed('canteen_items', "INSERT INTO canteen_items (name, price) VALUES (?, ?)",
+          ((FOODS[i % len(FOODS)] + (f" #{i // len(FOODS)}" if i >= len(FOODS) else ''), float(rng.randint(10, 150)))
+           for i in range(counts['canteen_items'])))
+
+    items = [(r['item_id'], r['name'], r['price']) for r in conn.execute("SELECT item_id, name, price FROM canteen_items")]
+    meds = [(r['med_id'], r['name'], r['price']) for r in conn.execute("SELECT med_id, name, price FROM medicines LIMIT 500")]
+
+    started = time.perf_counter()
+    next_order = (conn.execute("SELECT COALESCE(MAX(order_id), 0) FROM canteen_orders").fetchone()[0])
+    n = 0
+    for batch in _chunks(range(counts['canteen_orders'])):
+        conn.execute("BEGIN IMMEDIATE")
+        for _ in batch:
+            basket = []
+            for item_id, name, price in rng.sample(items, rng.randint(1, min(4, len(items)))):
+                qty = rng.randint(1, 3)
+                basket.append(dict(item_id=item_id, name=name, qty=qty, price=price, subtotal=price * qty))
+            stamp = _stamp(rng, days, until)
+            cur = conn.execute("INSERT INTO canteen_orders (patient_id, items, total, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                               (str(rng.randint(1, max(1, counts['patients']))), json.dumps(basket),
+                                sum(b['subtotal'] for b in basket), 'placed', stamp))
+            conn.executemany(revenue.INSERT_LINE, revenue.order_line_rows(cur.lastrowid, basket, stamp[:10]))
+        conn.commit()
+        n += len(batch)
+    timings['canteen_orders'] = dict(rows=n, seconds=round(time.perf_counter() - started, 2))
+
+    started = time.perf_counter()
+    n = 0
+    for batch in _chunks(range(counts['bills'])):
+        conn.execute("BEGIN IMMEDIATE")
+        for _ in batch:
+            if rng.random() < 0.5:
+                med_id, name, price = rng.choice(meds)
+                qty = rng.randint(1, 5)
+                lines = [dict(desc=f"Medicine: {name} x{qty}", amount=price * qty, item=name, item_id=med_id, qty=qty)]
+                source, patient = 'pharmacy', 'store'
+            else:
+                lines = [dict(desc=d, amount=float(rng.randint(100, 20000)))
+                         for d in rng.sample(['Consultation', 'Room charges', 'X-Ray', 'MRI', 'Blood test', 'Surgery'],
+                                             rng.randint(1, 3))]
+                source, patient = 'billing', str(rng.randint(1, max(1, counts['patients'])))
+            stamp = _stamp(rng, days, until)
+            cur = conn.execute("INSERT INTO bills (patient_id, items, total, date) VALUES (?, ?, ?, ?)",
+                               (patient, json.dumps([dict(desc=l['desc'], amount=l['amount']) for l in lines]),
+                                sum(l['amount'] for l in lines), stamp))
+            conn.executemany(revenue.INSERT_LINE, revenue.bill_line_rows(cur.lastrowid, source, lines, stamp[:10]))
+        conn.commit()
+        n += len(batch)
+    timings['bills'] = dict(rows=n, seconds=round(time.perf_counter() - started, 2))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill a hospital database with seeded synthetic data.")
+    parser.add_argument('--db', required=True, help="SQLite file to fill (never defaults to the live database)")
+    parser.add_argument('--scale', type=int, default=10000, help="number of patients; other tables scale from it")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--days', type=int, default=365, help="spread bills/orders over this many days")
+    parser.add_argument('--until', default=UNTIL, help="date the bills/orders end at (default: %(default)s)")
+    for table in counts_for(1):
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, dest=table, help=f"override {table} count")
+    args = parser.parse_args(argv)
+
+    counts = counts_for(args.scale)
+    for table in counts:
+        if getattr(args, table) is not None:
+            counts[table] = getattr(args, table)
+
+    conn = db.connect(args.db)
+    migrations.migrate(conn)
+    started = time.perf_counter()
+    timings = generate(conn, counts, args.seed, args.days, args.until)
+    conn.execute("PRAGMA optimize")
+    conn.close()
+    for table, t in timings.items():
+        rate = round(t['rows'] / t['seconds']) if t['seconds'] else t['rows']
+        print(f"{table:15} {t['rows']:>10} rows {t['seconds']:>8}s  {rate:>8} rows/s")
+    print(f"total {round(time.perf_counter() - started, 1)}s -> {args.db}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+import argparse, datetime, json, os, random, sys, threading, time
+import urllib.error, urllib.parse, urllib.request
+
+from flask.json.tag import TaggedJSONSerializer
+from itsdangerous import URLSafeSerializer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load harness. Each route is driven in turn by N concurrent clients for a
+# fixed duration; per-route latency percentiles and throughput are printed
+# and saved as JSON so runs can be compared (--baseline).
+#
+# With --url it talks HTTP to a running server (gunicorn, flask run...).
+# Without it, it runs in-process through Flask's test client, which measures
+# the app and database without any network or server overhead; it needs
+# --db, since the write routes change the data.
+#
+# Form routes report a refused write (bed taken, out of stock...) as a
+# "danger" flash on the usual redirect. Both clients read the flash back out
+# of the session cookie and count such a response as a 409.
+
+ROUTES = ['dashboard', 'patients', 'order_food', 'buy_medicine', 'assign_bed', 'billing']
+
+
+_SESSION = URLSafeSerializer('', serializer=TaggedJSONSerializer())
+
+
+def refused(set_cookies):
+    # Only the payload is decoded; the signature is not checked, so this
+    # needs no secret key
+    for header in set_cookies:
+        name, _, value = header.split(';', 1)[0].partition('=')
+        if name.strip() != 'session' or not value:
+            continue
+        try:
+            session = _SESSION.load_payload(value.rsplit('.', 2)[0].encode())
+        except Exception:
+            return False
+        return any(category == 'danger' for category, _ in session.get('_flashes', ()))
+    return False
+
+
+def _status(status, set_cookies):
+    if 300 <= status < 400 and refused(set_cookies):
+        return 409
+    return status
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(NoRedirect)
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=30) as resp:
+                resp.read()
+                return _status(resp.status, resp.headers.get_all('Set-Cookie') or [])
+        except urllib.error.HTTPError as e:
+            e.read()
+            return _status(e.code, e.headers.get_all('Set-Cookie') or [])
+
+    def get_json(self, path):
+        with self.opener.open(self.base_url + path, timeout=30) as resp:
+            return json.loads(resp.read())
+
+
+class InProcessClient:
+
+    def __init__(self, app):
+        self.client = app.test_client(use_cookies=False)
+
+    def request(self, method, path, data=None):
+        resp = self.client.open(path, method=method, data=data)
+        resp.get_data()
+        return _status(resp.status_code, resp.headers.getlist('Set-Cookie'))
+
+    def get_json(self, path):
+        return self.client.get(path).get_json()
+
+
+def _ids(client, resource, key, pages=5, keep=lambda row: True):
+    ids, path = [], f"/api/v1/{resource}?limit=200"
+    for _ in range(pages):
+        page = client.get_json(path)
+        ids.extend(r[key] for r in page['rows'] if keep(r))
+        if not page['next']:
+            break
+        path = f"/api/v1/{resource}?limit=200&after={page['next']}"
+    return ids
+
+
+class Fixtures:
+    # Ids the write routes need, sampled once through the JSON API.
+
+    def __init__(self, client):
+        self.patients = _ids(client, 'patients', 'patient_id') or [1]
+        self.medicines = _ids(client, 'medicines', 'med_id')
+        self.items = _ids(client, 'canteen/items', 'item_id')
+        # Only beds that start out free; occupied ones are left alone
+        self.beds = _ids(client, 'facilities', 'bed_id', keep=lambda r: r['availability'] == 'available')
+
+
+def make_call(route, client, fx, rng):
+    # Returns (timed call, untimed cleanup or None). Each call returns the
+    # HTTP status.
+    if route == 'dashboard':
+        return (lambda: client.request('GET', '/dashboard')), None
+    if route == 'patients':
+        return (lambda: client.request('GET', '/patients')), None
+    if route == 'order_food':
+        def call():
+            picks = rng.sample(fx.items, min(len(fx.items), rng.randint(1, 4)))
+            form = {f"item_{i}": rng.randint(1, 3) for i in picks}
+            form['patient_id'] = rng.choice(fx.patients)
+            return client.request('POST', '/order_food', form)
+        return call, None
+    if route == 'buy_medicine':
+        return (lambda: client.request('POST', '/buy_medicine',
+                                       dict(med_id=rng.choice(fx.medicines), quantity=1))), None
+    if route == 'assign_bed':
+        claimed = [None]
+
+        def call():
+            bed = rng.choice(fx.beds)
+            status = client.request('POST', '/assign_bed', dict(bed_id=bed, patient_id=rng.choice(fx.patients)))
+            claimed[0] = bed if status < 400 else None
+            return status
+
+        def release():
+            # Hand back only a bed this client got, keeping the pool of free
+            # beds steady; a refused claim means someone else holds it
+            if claimed[0] is not None:
+                client.request('POST', f'/release_bed/{claimed[0]}')
+        return call, release
+    if route == 'billing':
+        return (lambda: client.request('POST', '/billing', dict(
+            patient_id=rng.choice(fx.patients), line_count=2,
+            desc_1='Consultation', amt_1=rng.randint(100, 2000),
+            desc_2='Blood test', amt_2=rng.randint(100, 900)))), None
+    raise ValueError(f"unknown route {route}")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def run_route(route, new_client, fx, clients, duration, seed):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(n):
+        rng = random.Random(seed * 1000 + n)
+        call, cleanup = make_call(route, new_client(), fx, rng)
+        mine, failed = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = call()
+            except Exception:
+                status = 599
+            mine.append(time.perf_counter() - started)
+            if status >= 400:
+                failed += 1
+            if cleanup:
+                cleanup()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 2) if v is not None else None
+    return dict(
+        requests=len(latencies),
+        errors=errors[0],
+        throughput=round(len(latencies) / elapsed, 1),
+        mean_ms=ms(sum(latencies) / len(latencies)) if latencies else None,
+        p50_ms=ms(percentile(latencies, 50)),
+        p95_ms=ms(percentile(latencies, 95)),
+        p99_ms=ms(percentile(latencies, 99)),
+        max_ms=ms(latencies[-1]) if latencies else None,
+    )
+
+
+def compare(results, baseline):
+    print("\nvs baseline:")
+    for route, now in results['routes'].items():
+        before = baseline.get('routes', {}).get(route)
+        if not before:
+            continue
+        parts = []
+        for key in ('throughput', 'p50_ms', 'p99_ms'):
+            if before.get(key) and now.get(key) is not None:
+                change = (now[key] - before[key]) / before[key] * 100
+                parts.append(f"{key} {before[key]} -> {now[key]} ({change:+.1f}%)")
+        print(f"  {route:13} " + ", ".join(parts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive app.py routes with concurrent clients.")
+    parser.add_argument('--url', help="base URL of a running server; omit to run in-process")
+    parser.add_argument('--db', help="SQLite file for an in-process run (required without --url; it is written to)")
+    parser.add_argument('--routes', default=','.join(ROUTES), help="comma-separated subset of %(default)s")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per route")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', default='bench-results.json')
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        new_client = lambda: HttpClient(args.url)
+    else:
+        if not args.db:
+            parser.error("--db is required for an in-process run: the write routes change the data")
+        os.environ['HOSPITAL_DB'] = os.path.abspath(args.db)
+        from app import app
+        new_client = lambda: InProcessClient(app)
+
+    fx = Fixtures(new_client())
+    results = dict(
+        started_at=datetime.datetime.now().isoformat(timespec='seconds'),
+        target=args.url or 'in-process',
+        clients=args.clients,
+        duration=args.duration,
+        seed=args.seed,
+        routes={},
+    )
+    print(f"{'route':13} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for route in [r.strip() for r in args.routes.split(',') if r.strip()]:
+        r = run_route(route, new_client, fx, args.clients, args.duration, args.seed)
+        results['routes'][route] = r
+        print(f"{route:13} {r['requests']:>7} {r['errors']:>5} {r['throughput']:>8} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nsaved {args.out}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
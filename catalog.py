@@ -0,0 +1,46 @@
+import threading
+
+import versions
+from db import query_all
+
+# Process-local cache of canteen item prices. Entries are only trusted while
+# the canteen_items version matches the one they were loaded under, so an
+# item added through another worker is seen on that worker's next order.
+
+
+class CanteenCatalog:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = {}
+        self._version = None
+
+    def invalidate(self):
+        with self._lock:
+            self._items = {}
+            self._version = None
+
+    def lookup(self, item_ids):
+        # Returns {item_id: row} for the ids that exist. Warm path is one
+        # version read; anything missing is loaded with a single IN (...).
+        item_ids = set(item_ids)
+        version = versions.current('canteen_items')
+        with self._lock:
+            if version != self._version:
+                self._items = {}
+                self._version = version
+            found = {i: self._items[i] for i in item_ids if i in self._items}
+        missing = item_ids - found.keys()
+        if missing:
+            marks = ', '.join('?' * len(missing))
+            rows = query_all(f"SELECT item_id, name, price FROM canteen_items WHERE item_id IN ({marks})",
+                             tuple(missing))
+            loaded = {r["item_id"]: dict(r) for r in rows}
+            with self._lock:
+                if self._version == version:
+                    self._items.update(loaded)
+            found.update(loaded)
+        return found
+
+
+catalog = CanteenCatalog()
@@ -0,0 +1,392 @@
+import concurrent.futures, os, queue, sqlite3, threading, time
+from contextlib import contextmanager
+from flask import g, jsonify
+
+import metrics, slowlog
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("HOSPITAL_DB", os.path.join(BASE_DIR, "hospital.db"))
+
+# Pool / connection tuning (override through the environment on the server)
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+
+# Group commit (off by default): writes go through one writer thread that
+# commits them in batches, see GroupCommitter below.
+GROUP_COMMIT = os.environ.get("GROUP_COMMIT", "") in ("1", "true", "yes")
+GROUP_COMMIT_WINDOW_MS = float(os.environ.get("GROUP_COMMIT_WINDOW_MS", "2"))
+GROUP_COMMIT_MAX = int(os.environ.get("GROUP_COMMIT_MAX", "64"))
+GROUP_COMMIT_SYNCHRONOUS = os.environ.get("GROUP_COMMIT_SYNCHRONOUS", "FULL")
+GROUP_COMMIT_TIMEOUT = float(os.environ.get("GROUP_COMMIT_TIMEOUT", "30"))
+
+# WAL lets readers keep going while a writer commits; synchronous=NORMAL is
+# still crash-safe in WAL mode and saves one fsync per commit.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=134217728",
+)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class WriterUnavailable(Exception):
+    pass
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    # Bounded set of connections. Each one is used by a single request at a
+    # time, so check_same_thread=False only lets it move between threads.
+
+    def __init__(self, path=None, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.path = path or DB_PATH
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            grow = self._created < self.size
+            if grow:
+                self._created += 1
+        if grow:
+            try:
+                return connect(self.path)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"no database connection free after {self.timeout}s")
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+pool = ConnectionPool()
+
+
+@contextmanager
+def pooled():
+    # For code running outside a request (schema setup, CLI commands).
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+# ---------------- Group commit ----------------
+
+class GroupCommitter:
+    # One writer thread with its own connection drains a queue of write
+    # operations (callables taking a cursor). Whatever is queued, plus
+    # anything arriving within the window, up to max_batch operations, is
+    # applied in a single transaction, and each caller's future completes
+    # once that commit is done. Each operation runs inside its own
+    # SAVEPOINT, so one that raises is rolled back alone and gets the
+    # exception, while the rest of the batch still commits.
+    #
+    # The writer connection runs synchronous=FULL by default: a completed
+    # write is on disk, and the fsync is shared by the whole batch.
+    #
+    # If the writer thread dies (say the database can't be opened) whatever
+    # is queued fails with WriterUnavailable and the next submit() starts a
+    # new one; a caller of run() never waits more than `timeout` for its
+    # write to start.
+
+    def __init__(self, path=None, window=GROUP_COMMIT_WINDOW_MS / 1000, max_batch=GROUP_COMMIT_MAX,
+                 synchronous=GROUP_COMMIT_SYNCHRONOUS, timeout=GROUP_COMMIT_TIMEOUT):
+        self.path = path or DB_PATH
+        self.window = window
+        self.max_batch = max_batch
+        self.synchronous = synchronous
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn):
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+            self._queue.put((fn, future))
+        return future
+
+    def run(self, fn):
+        future = self.submit(fn)
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            # Withdraw it if the writer hasn't started it yet; once running
+            # it is about to commit, so wait for the outcome
+            if future.cancel():
+                raise WriterUnavailable(f"write not started after {self.timeout}s")
+            return future.result()
+
+    def _batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            conn = connect(self.path)
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            cur = conn.cursor()
+            while True:
+                self._apply(conn, cur, self._batch())
+        except BaseException as e:
+            error = WriterUnavailable(f"group-commit writer stopped: {e}")
+            with self._lock:
+                self._thread = None
+                while True:
+                    try:
+                        _, future = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(error)
+            raise
+
+    def _apply(self, conn, cur, batch):
+        done = []
+        try:
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            metrics.LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+            for fn, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT op")
+                try:
+                    result = fn(cur)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    future.set_exception(e)
+                else:
+                    conn.execute("RELEASE op")
+                    done.append((future, result))
+            commit(conn)
+        except Exception as e:
+            # BEGIN or COMMIT itself failed: nothing in this batch was written
+            if conn.in_transaction:
+                conn.rollback()
+            for future, _ in done:
+                future.set_exception(e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        metrics.GROUP_COMMIT_BATCH.observe(len(done))
+        for future, result in done:
+            future.set_result(result)
+
+
+writer = GroupCommitter() if GROUP_COMMIT else None
+
+
+def _after_fork():
+    # A connection must never be used by two processes: a forked worker
+    # starts with an empty pool and its own writer thread.
+    global pool, writer
+    pool = ConnectionPool(pool.path, pool.size, pool.timeout)
+    if writer is not None:
+        writer = GroupCommitter(writer.path, writer.window, writer.max_batch, writer.synchronous, writer.timeout)
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+# ---------------- Per-request connection ----------------
+
+class Cursor(sqlite3.Cursor):
+    # Request cursor that counts its statements and the time spent in them
+    # (execute plus fetching) for the per-request metrics, and passes
+    # statements slower than slowlog.THRESHOLD to the slow-query log.
+    statements = 0
+    seconds = 0.0
+    _last = None    # [sql, params, seconds so far] of the latest statement
+
+    def _ran(self, sql, params, started):
+        elapsed = time.perf_counter() - started
+        self.statements += 1
+        self.seconds += elapsed
+        self._last = [sql, params, elapsed]
+        if elapsed >= slowlog.THRESHOLD:
+            slowlog.record(self.connection, sql, params, elapsed)
+
+    def _fetched(self, started):
+        elapsed = time.perf_counter() - started
+        self.seconds += elapsed
+        last = self._last
+        if last is not None:
+            already = last[2] >= slowlog.THRESHOLD
+            last[2] += elapsed
+            if not already and last[2] >= slowlog.THRESHOLD:
+                slowlog.record(self.connection, *last)
+
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._ran(sql, params, started)
+
+    def executemany(self, sql, seq):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq)
+        finally:
+            self._ran(sql, None, started)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._fetched(started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._fetched(started)
+
+
+def get_db():
+    if "db" not in g:
+        started = time.perf_counter()
+        g.db = pool.acquire()
+        metrics.POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+        g.cur = g.db.cursor(Cursor)
+    return g.db
+
+
+def get_cursor():
+    get_db()
+    return g.cur
+
+
+def close_db(exc=None):
+    g.pop("cur", None)
+    conn = g.pop("db", None)
+    if conn is not None:
+        pool.release(conn)
+
+
+def unavailable(e):
+    # No connection or no writer within the timeout: tell the client to
+    # retry rather than hang or fail with a 500
+    return jsonify(error=str(e)), 503
+
+
+def init_app(app):
+    app.teardown_appcontext(close_db)
+    app.register_error_handler(PoolTimeout, unavailable)
+    app.register_error_handler(WriterUnavailable, unavailable)
+
+
+# ---------------- Helper functions ----------------
+
+def query_all(query, params=()):
+    cur = get_cursor()
+    cur.execute(query, params)
+    return cur.fetchall()
+
+def query_one(query, params=()):
+    cur = get_cursor()
+    cur.execute(query, params)
+    return cur.fetchone()
+
+@contextmanager
+def transaction():
+    # BEGIN IMMEDIATE takes the write lock up front, so everything inside
+    # sees a stable view and lands in a single commit (one fsync).
+    conn = get_db()
+    started = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    metrics.LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+    try:
+        yield g.cur
+    except BaseException:
+        conn.rollback()
+        raise
+    commit(conn)
+
+def commit(conn):
+    started = time.perf_counter()
+    conn.commit()
+    metrics.COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+def execute(query, params=()):
+    if _grouped():
+        return writer.run(lambda cur: cur.execute(query, params).lastrowid)
+    cur = get_cursor()
+    cur.execute(query, params)
+    commit(g.db)
+    return cur.lastrowid
+
+def write(fn):
+    # Run fn(cur) as one write transaction and return its result: on the
+    # group-commit writer when GROUP_COMMIT is on, otherwise on the
+    # request's own connection. fn must only use the cursor it is given.
+    if _grouped():
+        return writer.run(fn)
+    with transaction() as cur:
+        return fn(cur)
+
+def _grouped():
+    # A request already inside transaction() holds the write lock; queueing
+    # behind the writer from there would deadlock.
+    return writer is not None and not ("db" in g and g.db.in_transaction)
@@ -0,0 +1,165 @@
+import collections, json, os, sqlite3, threading
+
+import db
+
+# Live dashboard feed (Server-Sent Events).
+#
+# One publisher thread per worker process computes the dashboard state and
+# fans it out to every connected screen, so a change costs one snapshot
+# query no matter how many screens are listening. Routes in this process
+# call notify() after committing a change, which wakes the publisher
+# immediately. Changes made by other workers are picked up by polling the
+# table_versions counters every POLL_INTERVAL seconds.
+
+POLL_INTERVAL = float(os.environ.get("DASHBOARD_POLL_INTERVAL", "1.0"))
+KEEPALIVE = 15.0
+HISTORY = 64
+
+WATCHED = ('patients', 'doctors', 'nurses', 'medicines', 'facilities', 'bills')
+
+
+SNAPSHOT_STATS = "SELECT * FROM dashboard_stats WHERE id = 1"
+SNAPSHOT_MEDS = "SELECT name, quantity FROM medicines ORDER BY med_id DESC LIMIT 8"
+VERSION_STAMP = (f"SELECT version FROM table_versions WHERE name IN ({', '.join('?' * len(WATCHED))}) "
+                 f"ORDER BY name")
+
+
+def build_snapshot(row, meds):
+    return dict(
+        patients=row["patients"],
+        doctors=row["doctors"],
+        nurses=row["nurses"],
+        medicines=row["medicines"],
+        occupied_beds=row["occupied_beds"],
+        available_beds=row["available_beds"],
+        revenue=row["revenue_paise"] / 100,
+        med_labels=[r["name"] for r in meds],
+        med_values=[r["quantity"] for r in meds],
+    )
+
+
+def snapshot(conn):
+    return build_snapshot(conn.execute(SNAPSHOT_STATS).fetchone(), conn.execute(SNAPSHOT_MEDS).fetchall())
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Feed:
+    # Sequence-numbered dashboard state plus the last HISTORY deltas, shared
+    # by the thread-based Broadcaster below and the asyncio one in asgi.py.
+    # Callers hold their own lock/condition around it.
+
+    def __init__(self):
+        self.seq = 0
+        self.state = None
+        self.history = collections.deque(maxlen=HISTORY)
+
+    def publish(self, state):
+        old = self.state or {}
+        delta = {k: v for k, v in state.items() if old.get(k) != v}
+        if not delta:
+            return False
+        self.seq += 1
+        self.state = state
+        self.history.append((self.seq, delta))
+        return True
+
+    def since(self, seq):
+        # The SSE message that brings a screen at `seq` up to date
+        if self.seq == seq:
+            return ": keep-alive\n\n"
+        if self.history and self.history[0][0] <= seq + 1:
+            # Merge every delta this screen hasn't seen yet
+            merged = {}
+            for n, delta in self.history:
+                if n > seq:
+                    merged.update(delta)
+            return format_event("delta", merged)
+        # Fell too far behind: send the whole state again
+        return format_event("snapshot", self.state)
+
+
+class Broadcaster:
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._thread = None
+        self._subscribers = 0
+        self._feed = Feed()
+
+    def notify(self):
+        self._wake.set()
+
+    def _start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="dashboard-events", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        conn = db.connect()
+        seen = None
+        while True:
+            with self._cond:
+                idle = self._subscribers == 0
+            self._wake.wait(None if idle else POLL_INTERVAL)
+            self._wake.clear()
+            try:
+                stamp = tuple(r[0] for r in conn.execute(VERSION_STAMP, WATCHED))
+                if stamp == seen and self._feed.state is not None:
+                    continue
+                state = snapshot(conn)
+            except sqlite3.Error:
+                # e.g. locked during a migration; try again on the next tick
+                continue
+            seen = stamp
+            with self._cond:
+                if self._feed.publish(state):
+                    self._cond.notify_all()
+
+    def stream(self):
+        feed = self._feed
+        with self._cond:
+            self._subscribers += 1
+        self._start()
+        self._wake.set()
+        try:
+            with self._cond:
+                self._cond.wait_for(lambda: feed.state is not None, timeout=KEEPALIVE)
+                seq, state = feed.seq, feed.state
+            yield "retry: 3000\n\n"
+            if state is not None:
+                yield format_event("snapshot", state)
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: feed.seq > seq, timeout=KEEPALIVE)
+                    out = feed.since(seq)
+                    seq = feed.seq
+                yield out
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+
+broadcaster = Broadcaster()
+
+
+def _after_fork():
+    # The publisher thread (and its lock) don't survive a fork
+    global broadcaster
+    broadcaster = Broadcaster()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+# Extra wake-up hooks (the asyncio broadcaster registers one in ASGI mode)
+listeners = []
+
+
+def notify():
+    broadcaster.notify()
+    for listener in listeners:
+        listener()
@@ -0,0 +1,137 @@
+import csv, datetime, io, json, zlib
+
+import db
+
+# Streaming exports. Rows are pulled from the cursor in small batches and
+# written straight to the response, so memory stays constant however many
+# rows match. Each export uses its own connection (not one from the request
+# pool); in WAL mode its long read never blocks writers.
+
+BATCH_SIZE = 1000
+
+# kind -> (table, date column or None, ordering)
+KINDS = {
+    'bills': ('bills', 'date', 'date, bill_id'),
+    'canteen_orders': ('canteen_orders', 'created_at', 'created_at, order_id'),
+    'patients': ('patients', None, 'patient_id'),
+}
+
+
+class ExportFailed(Exception):
+    pass
+
+
+def parse_day(value, field):
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ExportFailed(f"{field} must be a date (YYYY-MM-DD)")
+
+
+def build_query(kind, start=None, end=None):
+    # start/end are inclusive days; dates are stored as ISO strings, so
+    # "< the day after end" covers every timestamp on the last day.
+    if kind not in KINDS:
+        raise ExportFailed(f"unknown export {kind!r}")
+    table, date_col, order = KINDS[kind]
+    where, params = [], []
+    if (start or end) and not date_col:
+        raise ExportFailed(f"{kind} has no date to filter on")
+    if start:
+        where.append(f"{date_col} >= ?")
+        params.append(start.isoformat())
+    if end:
+        where.append(f"{date_col} < ?")
+        params.append((end + datetime.timedelta(days=1)).isoformat())
+    sql = f"SELECT * FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + f" ORDER BY {order}", params
+
+
+def _rows(sql, params):
+    conn = db.connect()
+    try:
+        cur = conn.execute(sql, params)
+        columns = [d[0] for d in cur.description]
+        yield columns
+        while True:
+            batch = cur.fetchmany(BATCH_SIZE)
+            if not batch:
+                break
+            yield batch
+    finally:
+        conn.close()
+
+
+class Encoder:
+    # Turns batches of rows into CSV or JSONL bytes (optionally gzipped).
+    # Used by the streaming generator below and by the async export in asgi.py.
+
+    def __init__(self, columns, fmt, gzip=False):
+        self.columns = columns
+        self.fmt = fmt
+        self.packer = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+        self.buf = io.StringIO()
+        self.writer = csv.writer(self.buf)
+
+    def _out(self, data):
+        return self.packer.compress(data) if self.packer else data
+
+    def header(self):
+        if self.fmt != 'csv':
+            return b""
+        self.writer.writerow(self.columns)
+        return self._take()
+
+    def _take(self):
+        data = self.buf.getvalue().encode()
+        self.buf.seek(0)
+        self.buf.truncate()
+        return self._out(data)
+
+    def batch(self, rows):
+        if self.fmt == 'csv':
+            self.writer.writerows(rows)
+            return self._take()
+        return self._out("".join(json.dumps(dict(zip(self.columns, r))) + "\n" for r in rows).encode())
+
+    def finish(self):
+        return self.packer.flush() if self.packer else b""
+
+
+def _encode(rows, fmt, gzip):
+    encoder = Encoder(next(rows), fmt, gzip)
+    header = encoder.header()
+    if header:
+        yield header
+    for batch in rows:
+        chunk = encoder.batch(batch)
+        if chunk:
+            yield chunk
+    tail = encoder.finish()
+    if tail:
+        yield tail
+
+
+def check_format(fmt):
+    if fmt not in ('csv', 'jsonl'):
+        raise ExportFailed(f"unsupported format {fmt!r} (csv or jsonl)")
+
+
+def headers(kind, fmt, gzip):
+    # (mimetype, extra headers) for an export response
+    filename = f"{kind}.{fmt}" + ('.gz' if gzip else '')
+    if gzip:
+        mimetype = 'application/gzip'
+    else:
+        mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return mimetype, {'Content-Disposition': f'attachment; filename={filename}'}
+
+
+def stream(kind, fmt, start=None, end=None, gzip=False):
+    check_format(fmt)
+    sql, params = build_query(kind, start, end)
+    return _encode(_rows(sql, params), fmt, gzip)
@@ -0,0 +1,83 @@
+import collections, os, threading, time
+from markupsafe import Markup
+
+import metrics, versions
+
+# Cache of rendered HTML fragments for lists that rarely change (doctors,
+# the doctor picker, the canteen menu).
+#
+# Each entry remembers the table_versions of the tables it was built from
+# and is only served while they still match. Those versions are themselves
+# cached for VERSION_TTL seconds, so a warm hit does not touch SQLite at
+# all: writes in this worker call invalidate() and are seen immediately,
+# writes in other workers are picked up within VERSION_TTL. Memory is
+# bounded by MAX_BYTES of HTML, least recently used entries go first.
+
+VERSION_TTL = float(os.environ.get("FRAGMENT_VERSION_TTL", "1.0"))
+MAX_BYTES = int(os.environ.get("FRAGMENT_CACHE_BYTES", str(4 * 1024 * 1024)))
+
+LOOKUPS = metrics.Counter('fragment_cache_total', 'Fragment cache lookups.', ('fragment', 'result'))
+
+
+class FragmentCache:
+
+    def __init__(self, max_bytes=MAX_BYTES, ttl=VERSION_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()   # (name, key) -> (tables, stamp, html)
+        self._size = 0
+        self._versions = {}                          # table -> (version, checked at)
+
+    def _stamp(self, tables):
+        now = time.monotonic()
+        with self._lock:
+            known = {t: self._versions.get(t) for t in tables}
+        stale = [t for t, v in known.items() if v is None or now - v[1] > self.ttl]
+        if stale:
+            fresh = dict(zip(stale, versions.many(stale)))
+            with self._lock:
+                for t, version in fresh.items():
+                    self._versions[t] = (version, now)
+            known.update({t: (version, now) for t, version in fresh.items()})
+        return tuple(known[t][0] for t in tables)
+
+    def render(self, name, tables, key, build):
+        # `build()` renders the fragment; it only runs on a miss
+        stamp = self._stamp(tables)
+        with self._lock:
+            entry = self._entries.get((name, key))
+            if entry is not None and entry[1] == stamp:
+                self._entries.move_to_end((name, key))
+                LOOKUPS.inc(name, 'hit')
+                return entry[2]
+        LOOKUPS.inc(name, 'miss')
+        html = Markup(build())
+        with self._lock:
+            old = self._entries.pop((name, key), None)
+            if old is not None:
+                self._size -= len(old[2])
+            if len(html) <= self.max_bytes:
+                self._entries[(name, key)] = (tables, stamp, html)
+                self._size += len(html)
+            while self._size > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return html
+
+    def invalidate(self, *tables):
+        # Call after committing a write to any of `tables`
+        with self._lock:
+            for t in tables:
+                self._versions.pop(t, None)
+            for k in [k for k, e in self._entries.items() if set(e[0]) & set(tables)]:
+                self._size -= len(self._entries.pop(k)[2])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._size = 0
+
+
+cache = FragmentCache()
@@ -1,7 +1,11 @@
 import datetime
+import csv
+import json
+import os
+import sys
 import random as rd
-import pandas as pd
 import mysql.connector as sqltor
+import tabular
 con=sqltor.connect(host="localhost",user="root",password="hello")
 cur=con.cursor()
 
@@ -11,6 +15,10 @@ cur.execute("create database if not exists hello")
 
 cur.execute("use hello")
 
+# Every terminal books against the same calendar, so plain reads should see
+# what the others have committed rather than the snapshot of the first select
+cur.execute("set session transaction isolation level read committed")
+
 cur.execute("create table if not exists appt"
             "("
             "idno char(12) primary key,"
@@ -20,6 +28,454 @@ cur.execute("create table if not exists appt"
             "phone char(10),"
             "bg char(3))")
 
+# ---- Patient fields ----
+# Column checks shared by registration and every kind of correction. Each
+# one returns the cleaned value or raises ValueError with the message shown
+# to the user.
+COLUMNS=("idno","name","age","gender","phone","bg")
+BLOOD_GROUPS=("A+","B+","O+","AB+","A-","B-","O-","AB-")
+
+def check_idno(v):
+    v=str(v).strip()
+    if len(v)!=12 or not v.isdigit():
+        raise ValueError("12 digits required")
+    return v
+
+def check_name(v):
+    v=str(v).strip()
+    if not v or len(v)>20:
+        raise ValueError("name required (max 20 letters)")
+    return v
+
+def check_age(v):
+    try:
+        v=int(str(v).strip())
+    except ValueError:
+        raise ValueError("digits required")
+    if v<0 or v>150:
+        raise ValueError("enter a valid age")
+    return v
+
+def check_gender(v):
+    v=str(v).strip().upper()
+    if v not in ("M","F"):
+        raise ValueError("M/F only")
+    return v
+
+def check_phone(v):
+    v=str(v).strip()
+    if len(v)!=10 or not v.isdigit():
+        raise ValueError("10 digits required")
+    return v
+
+def check_bg(v):
+    v=str(v).strip().upper()
+    if v not in BLOOD_GROUPS:
+        raise ValueError("Enter valid value")
+    return v
+
+# column -> (what the prompt asks for, check)
+FIELDS={"name":("NAME",check_name),
+        "age":("AGE",check_age),
+        "gender":("GENDER",check_gender),
+        "phone":("PHONE NO",check_phone),
+        "bg":("BLOOD GROUP",check_bg)}
+
+
+def ask(prompt,check):
+    # Asks until the answer passes the check
+    while True:
+        try:
+            return check(input(prompt))
+        except ValueError as err:
+            print("~!~!~!~~",err,"~~!~!~!~")
+
+
+def show(row):
+    print("""     Adhaar no.:-""",row[0])
+    print('''     Name:-''',row[1])
+    print('''     Age:-''',row[2])
+    print('''     Gender:-''',row[3])
+    print('''     Phone:-''',row[4])
+    print('''     Bloodgroup:-''',row[5])
+
+
+def read_rows(path):
+    # CSV with a header row, or JSONL (one object per line).
+    # Yields (line no., dict or None if the line can't be read)
+    with open(path,newline="",encoding="utf-8-sig") as fh:
+        if path.lower().endswith((".jsonl",".ndjson")):
+            for n,line in enumerate(fh,1):
+                if line.strip():
+                    try:
+                        row=json.loads(line)
+                    except ValueError:
+                        row=None
+                    yield n,(row if isinstance(row,dict) else None)
+        else:
+            reader=csv.DictReader(fh)
+            for row in reader:
+                yield reader.line_num,row
+
+
+def update(idn,changes):
+    # Any set of columns in one UPDATE and one commit. Column names only
+    # ever come from FIELDS, values are always parameters.
+    sets=", ".join(c+"=%s" for c in changes)
+    cur.execute("update appt set "+sets+" where idno=%s",(*changes.values(),idn))
+    con.commit()
+
+
+def edit(columns):
+    adr=input('ENTER YOUR ADHAAR NO:').strip()
+    cur.execute('select * from appt where idno=(%s)',(adr,))
+    row=cur.fetchone()
+    if row is None:
+        print('~!~!~!~!~~NO DATA FOUND~~!~!~!~!~')
+        return("")
+    print('')
+    print('''
+            ------------------------    
+            | YOUR OLD DETAILS ARE |
+            ------------------------
+            ''')
+    print("")
+    show(row)
+    changes={}
+    for col in columns:
+        label,check=FIELDS[col]
+        changes[col]=ask('ENTER NEW '+label+':-',check)
+    update(adr,changes)
+    # The new details are the old row plus what was just written, no need
+    # to read it back
+    new=dict(zip(COLUMNS,row))
+    new.update(changes)
+    print('')
+    print('''
+           ------------------------      
+           | YOU NEW DETAILS ARE  |
+           ------------------------      
+                ''')
+    print('')
+    show([new[c] for c in COLUMNS])
+    return("")
+
+
+def registered(ids):
+    # Which of these Aadhaar numbers are in appt, 500 per query
+    ids=list(ids)
+    found=set()
+    for i in range(0,len(ids),500):
+        part=ids[i:i+500]
+        cur.execute("select idno from appt where idno in ("+",".join(["%s"]*len(part))+")",part)
+        found.update(idn for (idn,) in cur.fetchall())
+    return found
+
+
+def batch_edit(path):
+    # File of corrections: an idno column plus any of name, age, gender,
+    # phone, bg. Blank cells keep the current value. Every valid line for a
+    # registered patient is applied by one executemany in one transaction.
+    rows=[]
+    rejects=[]
+    try:
+        for n,row in read_rows(path):
+            try:
+                if row is None:
+                    raise ValueError("line can't be read")
+                idn=check_idno(row.get("idno",""))
+                values=[]
+                for col,(label,check) in FIELDS.items():
+                    v=row.get(col)
+                    values.append(None if v is None or str(v).strip()=="" else check(v))
+                if all(v is None for v in values):
+                    raise ValueError("nothing to change")
+                rows.append((n,(*values,idn)))
+            except ValueError as err:
+                rejects.append((n,str(err)))
+    except OSError as err:
+        print("~!~!~!~~ CAN'T READ FILE:",err,"~~!~!~!~")
+        return("")
+    known=registered({r[-1] for n,r in rows})
+    rejects+=[(n,"not registered") for n,r in rows if r[-1] not in known]
+    rows=[r for n,r in rows if r[-1] in known]
+    if rows:
+        sets=", ".join(c+"=coalesce(%s,"+c+")" for c in FIELDS)
+        try:
+            cur.executemany("update appt set "+sets+" where idno=%s",rows)
+            con.commit()
+        except sqltor.Error as err:
+            con.rollback()
+            print("~!~!~!~~ NOTHING WAS CHANGED:",err,"~~!~!~!~")
+            return("")
+    print(" ")
+    print("     CORRECTIONS APPLIED:-",len(rows))
+    print("     LINES REJECTED:-",len(rejects))
+    for n,err in sorted(rejects)[:20]:
+        print("       line",n,":-",err)
+    return("")
+
+
+REGISTER_CHUNK=500
+INSERT_PATIENT="insert into appt(idno,name,age,gender,phone,bg) values(%s,%s,%s,%s,%s,%s)"
+
+
+def check_patient(row):
+    # One line of a registration file -> the appt row, or ValueError
+    if row is None:
+        raise ValueError("line can't be read")
+    idn=check_idno(row.get("idno",""))
+    return (idn,*(check(row.get(col,"")) for col,(label,check) in FIELDS.items()))
+
+
+def insert_chunk(chunk,rejects):
+    # Inserts the chunk in one transaction, skipping (and rejecting) anyone
+    # already registered. Another terminal may register one of them in
+    # between, so a duplicate key just means look again.
+    while chunk:
+        taken=registered(r[1][0] for r in chunk)
+        for n,row,raw in chunk:
+            if row[0] in taken:
+                rejects.append((n,"already registered",raw))
+        chunk=[c for c in chunk if c[1][0] not in taken]
+        if not chunk:
+            return 0
+        try:
+            cur.executemany(INSERT_PATIENT,[r[1] for r in chunk])
+            con.commit()
+            return len(chunk)
+        except sqltor.IntegrityError:
+            con.rollback()
+    return 0
+
+
+def register_batch(path,rejects_path=None):
+    # Registers everyone in a CSV (header row) or JSONL file with the
+    # columns idno, name, age, gender, phone, bg. Valid patients go in
+    # REGISTER_CHUNK at a time, each chunk one multi-row INSERT and one
+    # commit; everything else is written to the rejects file with the
+    # reason, in a form that can be fixed and fed back in.
+    rejects_path=rejects_path or os.path.splitext(path)[0]+".rejects.csv"
+    chunk=[]
+    seen=set()
+    rejects=[]
+    count=0
+    try:
+        for n,raw in read_rows(path):
+            try:
+                row=check_patient(raw)
+                if row[0] in seen:
+                    raise ValueError("repeated in the file")
+            except ValueError as err:
+                rejects.append((n,str(err),raw))
+                continue
+            seen.add(row[0])
+            chunk.append((n,row,raw))
+            if len(chunk)==REGISTER_CHUNK:
+                count+=insert_chunk(chunk,rejects)
+                chunk=[]
+        count+=insert_chunk(chunk,rejects)
+    except OSError as err:
+        print("~!~!~!~~ CAN'T READ FILE:",err,"~~!~!~!~")
+        return("")
+    print(" ")
+    print("     PATIENTS REGISTERED:-",count)
+    print("     LINES REJECTED:-",len(rejects))
+    if rejects:
+        with open(rejects_path,"w",newline="",encoding="utf-8") as fh:
+            out=csv.writer(fh)
+            out.writerow(("line","reason")+COLUMNS)
+            for n,err,raw in sorted(rejects,key=lambda r:r[0]):
+                raw=raw or {}
+                out.writerow((n,err)+tuple(raw.get(c,"") for c in COLUMNS))
+        print("     REJECTS WRITTEN TO:-",rejects_path)
+    return("")
+
+
+# ---- Doctors and appointments ----
+# doctors is seeded from the directory below. doctor_days is each doctor's
+# calendar: one row per day that has bookings, with that day's capacity and
+# how many slots are taken. appointments holds the bookings themselves and
+# hands out the appointment numbers.
+#
+# doctors.next_free points at the first day that may still have room, so
+# finding the earliest free slot never looks at past or full days: every
+# statement in book() is a primary/unique key lookup and booking stays
+# just as fast with years of history in the tables.
+cur.execute("create table if not exists doctors"
+            "("
+            "doc_id int primary key,"
+            "name char(20),"
+            "department char(20),"
+            "room char(3),"
+            "password int,"
+            "slots int,"
+            "next_free date not null default '2000-01-01',"
+            "key dept(department))")
+
+cur.execute("create table if not exists doctor_days"
+            "("
+            "doc_id int,"
+            "day date,"
+            "capacity int,"
+            "booked int default 0,"
+            "primary key(doc_id,day))")
+
+cur.execute("create table if not exists appointments"
+            "("
+            "appointment_no int auto_increment primary key,"
+            "doc_id int not null,"
+            "day date not null,"
+            "slot int not null,"
+            "idno char(12) not null,"
+            "unique key doctor_slot(doc_id,day,slot))")
+
+# login id, name, department, room, password, slots per day
+DOCTORS=((1,"Varun","Cardiologist","201",7001,20),
+         (2,"Hrithik","Cardiologist","202",7002,20),
+         (3,"Salman","Psychitrist","203",7003,12),
+         (4,"Shahrukh","Psychitrist","204",7004,12),
+         (5,"Akshay","Otolaryngonologist","205",7005,20),
+         (6,"Amir","Otolaryngonologist","206",7006,20),
+         (7,"Sidharth","Rheumatologist","207",7007,16),
+         (8,"Abhishek","Rheumatologist","208",7008,16),
+         (9,"Ajay","Neurologist","209",7009,16),
+         (10,"Ranveer","Neurologist","200",7010,16),
+         (11,"Irfan","MI room","401",7011,40),
+         (12,"John","MI room","402",7012,40),
+         (13,"Sanjay","MI room","403",7013,40),
+         (14,"Shahid","MI room","404",7014,40))
+
+# appointment menu order, and how many days ahead each department books
+DEPARTMENTS=(("Cardiologist",3),
+             ("Rheumatologist",5),
+             ("Psychitrist",3),
+             ("Neurologist",6),
+             ("Otolaryngonologist",4),
+             ("MI room",1))
+
+cur.executemany("insert ignore into doctors(doc_id,name,department,room,password,slots)"
+                " values(%s,%s,%s,%s,%s,%s)",DOCTORS)
+
+cur.execute("create table if not exists services"
+            "("
+            "service_id int primary key,"
+            "name char(20),"
+            "room char(3))")
+
+cur.executemany("insert ignore into services values(%s,%s,%s)",
+                ((1,"X-Ray","101"),(2,"MRI","102"),(3,"CT Scan","103"),
+                 (4,"Endoscopy","104"),(5,"Dialysis","105"),(6,"Ultrasound","301"),
+                 (7,"EEG","302"),(8,"ENMG","303"),(9,"ECG","304")))
+con.commit()
+
+# The doctor and service lists only change when the tables are edited, so
+# they are read and laid out once at startup
+cur.execute("select name,department,room from doctors order by doc_id")
+DIRECTORY=tabular.render(["NAME OF DOCTOR","DEPARTMENT","ROOM NO."],
+                         [("Dr. "+n,d,int(r)) for n,d,r in cur.fetchall()])
+cur.execute("select name,room from services order by service_id")
+SERVICES=tabular.render(["Services","Room no."],[(n,int(r)) for n,r in cur.fetchall()])
+
+# Earliest day any doctor of the department may have room, least busy
+# doctor first on a tie
+PICK=("select d.doc_id,greatest(d.next_free,cast(%s as date)) as free"
+      " from doctors d left join doctor_days c"
+      " on c.doc_id=d.doc_id and c.day=greatest(d.next_free,cast(%s as date))"
+      " where d.department=%s"
+      " order by free,coalesce(c.booked,0),d.doc_id limit 1")
+
+# Rosters read one doctor's day. InnoDB appends the primary key to every
+# secondary index, so this is really (doc_id, day, appointment_no) and also
+# serves "booked since appointment no. N" as a range scan.
+cur.execute("select count(*) from information_schema.statistics"
+            " where table_schema=database() and table_name='appointments' and index_name='roster'")
+if cur.fetchone()[0]==0:
+    cur.execute("create index roster on appointments(doc_id,day)")
+
+DEADLOCK,DUPLICATE=1213,1062
+
+
+def book(idn,department):
+    # Books the earliest free slot in the department. Returns
+    # (appointment no., doctor, room, day, slot) or None if nothing is free
+    # within a year.
+    lead=dict(DEPARTMENTS)[department]
+    start=datetime.date.today()+datetime.timedelta(days=lead)
+    # Every full day found moves that doctor's next_free past it, so this
+    # ends once the pick runs off the end of the year, however many doctors
+    # the department has.
+    while True:
+        try:
+            cur.execute(PICK,(start,start,department))
+            found=cur.fetchone()
+            if found is None or found[1]>start+datetime.timedelta(days=366):
+                con.rollback()
+                return None
+            doc,day=found
+            cur.execute("insert into doctor_days(doc_id,day,capacity)"
+                        " select doc_id,%s,slots from doctors where doc_id=%s"
+                        " on duplicate key update booked=booked",(day,doc))
+            # Locks this doctor's day until commit, other terminals wait here
+            cur.execute("select booked,capacity from doctor_days"
+                        " where doc_id=%s and day=%s for update",(doc,day))
+            booked,capacity=cur.fetchone()
+            if booked>=capacity:
+                # Full: nobody needs to look at this day again
+                cur.execute("update doctors set next_free=%s where doc_id=%s and next_free<%s",
+                            (day+datetime.timedelta(days=1),doc,day+datetime.timedelta(days=1)))
+                con.commit()
+                continue
+            slot=booked+1
+            cur.execute("update doctor_days set booked=%s where doc_id=%s and day=%s",(slot,doc,day))
+            cur.execute("insert into appointments(doc_id,day,slot,idno) values(%s,%s,%s,%s)",
+                        (doc,day,slot,idn))
+            number=cur.lastrowid
+            cur.execute("select name,room from doctors where doc_id=%s",(doc,))
+            name,room=cur.fetchone()
+            con.commit()
+            return number,name,room,day,slot
+        except sqltor.Error as err:
+            con.rollback()
+            if err.errno not in (DEADLOCK,DUPLICATE):
+                raise
+
+
+# (doc_id, day) -> [roster rows, highest appointment no. seen]. Filled at
+# login and topped up with only the appointments booked since.
+ROSTERS={}
+
+
+def roster(doc,day):
+    rows,last=ROSTERS.get((doc,day),([],0))
+    cur.execute("select a.slot,p.name,p.age,a.appointment_no from appointments a"
+                " join appt p on p.idno=a.idno"
+                " where a.doc_id=%s and a.day=%s and a.appointment_no>%s"
+                " order by a.appointment_no",(doc,day,last))
+    new=cur.fetchall()
+    if new:
+        rows=sorted(rows+new)
+        last=new[-1][3]
+    ROSTERS[(doc,day)]=(rows,last)
+    return rows
+
+
+def show_roster(rows):
+    if not rows:
+        print("     NO APPOINTMENTS")
+        return
+    print(tabular.render(["SLOT","NAME OF PATIENT","AGE","APPOINTMENT NO."],rows))
+
+
+def login(doc):
+    # Loads today's and tomorrow's rosters; days gone by are dropped
+    today=datetime.date.today()
+    for key in [k for k in ROSTERS if k[1]<today]:
+        del ROSTERS[key]
+    roster(doc,today)
+    roster(doc,today+datetime.timedelta(days=1))
+
+
 tht1='''
                    BEAUTIFUL THINGS HAPPEN WHEN YOU DISTANCE YOURSELF FROM 
                   ---------------------------------------------------------
@@ -70,6 +526,21 @@ tht8='''
                                  '''
                                  
 th=(tht1,tht2,tht3,tht4,tht5,tht6,tht7,tht8)
+# Batch modes, no menus:
+#   python hospital_PROJECT.py register patients.csv [rejects.csv]
+#   python hospital_PROJECT.py corrections corrections.csv
+if len(sys.argv)>1:
+    if sys.argv[1]=="register" and len(sys.argv) in (3,4):
+        register_batch(*sys.argv[2:])
+    elif sys.argv[1]=="corrections" and len(sys.argv)==3:
+        batch_edit(sys.argv[2])
+    else:
+        print("usage: hospital_PROJECT.py register FILE [REJECTS] | corrections FILE")
+        con.close()
+        sys.exit(2)
+    con.close()
+    sys.exit(0)
+
 print("""  
   
                ___       ___   ___            ___     _____ ___       ___  _____ _____
@@ -118,43 +589,19 @@ while True:
  if e=="1" :
      
   def dat():
-        while True:
-            idn=input("Adhaar no.:")
-            if len(idn)==12 :
-                break
-            else:
-                print(" ~!~!~!~~12 digits required~~!~!~!~")
-               
-        name=input("Patient name:")
-        while True:
-            age=int(input("Age:"))
-            if type(age)!=int:
-                print("~!~!~!~~digits required~~!~!~!~")
-            else:
-                break
-
-        
-        while True:
-            gen=input("Gender M/F:")
-            if gen==("M") or gen==("F"):
-                break
-            else:
-                print("~!~!~!~~ M\F only ~~!~!~!~")
-        
-        while True:
-            ph=input("Phone no.:")
-            if len(ph)==10 :
-                break
-            else:
-                print("~!~!~!~~10 digits required~~!~!~!~")
-        while True:
-            bg=input("""Blood group(A+,B+,O+,AB+,A-,B-,O-,AB-):-""")
-            if bg==("A+") or bg==("B+") or bg==("o+") or bg==("AB+") or bg==("A-") or bg==("B-") or bg==("O-") or bg==("AB-"):
-                break
-            else:
-                print("~!~!~!~~ Enter valid value ~~!~!~!~")
-        cur.execute("insert into appt(idno,name,age,gender,phone,bg) values(%s,%s,%s,%s,%s,%s)",(idn,name,age,gen,ph,bg,))
-        con.commit()
+        idn=ask("Adhaar no.:",check_idno)
+        name=ask("Patient name:",check_name)
+        age=ask("Age:",check_age)
+        gen=ask("Gender M/F:",check_gender)
+        ph=ask("Phone no.:",check_phone)
+        bg=ask("""Blood group(A+,B+,O+,AB+,A-,B-,O-,AB-):-""",check_bg)
+        try:
+            cur.execute(INSERT_PATIENT,(idn,name,age,gen,ph,bg,))
+            con.commit()
+        except sqltor.IntegrityError:
+            con.rollback()
+            print("~!~!~!~~THIS ADHAAR NO. IS ALREADY REGISTERED~~!~!~!~")
+            return("")
         print(" ")
         print("""   
           __________________________        
@@ -170,274 +617,15 @@ while True:
         |_____________________________| 
         
         """)
-        cur.execute("select * from appt where idno=(%s);",(idn,))
-        d=cur.fetchall()
-        for i in d:
-            print("""     Adhaar no.:-""",i[0])
-            print('''     Name:-''',i[1])
-            print('''     Age:-''',i[2])
-            print('''     Gender:-''',i[3])
-            print('''     Phone:-''',i[4])
-            print('''     Bloodgroup:-''',i[5])
+        show((idn,name,age,gen,ph,bg))
         return("")
        
 
 
-  def name():
-        adr=int(input('ENTER YOUR ADHAAR NO:'))
-        cur.execute('select * from appt where idno=(%s)',(adr,))
-        dat=cur.fetchall()
-        a=[]
-        for i in dat:
-            a.append(i)
-            
-        if len(a)!=1:
-            print('~!~!~!~!~~NO DATA FOUND~~!~!~!~!~')
-            
-        else:
-            print('')
-            print('''
-            ------------------------    
-            | YOUR OLD DETAILS ARE |
-            ------------------------
-            ''')
-            
-            print("")
-            print("""     Adhaar no.:-""",i[0])
-            print('''     Name:-''',i[1])
-            print('''     Age:-''',i[2])
-            print('''     Gender:-''',i[3])
-            print('''     Phone:-''',i[4])
-            print('''     Bloodgroup:-''',i[5])
-            n=input('ENTER NEW NAME:-')
-            cur.execute('update appt set name=(%s) where idno=(%s);',(n,adr,))
-            con.commit()
-            cur.execute('select * from appt where idno=(%s)',(adr,))
-            dat=cur.fetchall()
-            for row in dat:
-                print('')
-                print('''
-           ------------------------      
-           | YOU NEW DETAILS ARE  |
-           ------------------------      
-                ''')
-                print('')                
-                print("""     Adhaar no.:-""",row[0])
-                print('''     Name:-''',row[1])
-                print('''     Age:-''',row[2])
-                print('''     Gender:-''',row[3])
-                print('''     Phone:-''',row[4])
-                print('''     Bloodgroup:-''',row[5])
-                con.commit()
-        return("")
-        
-               
-    
-
-  def age():
-        adr=int(input('ENTER YOUR ADHAAR NO:'))
-        cur.execute('select * from appt where idno=(%s)',(adr,))
-        dat=cur.fetchall()
-        a=[]
-        for i in dat:
-            a.append(i)
-            
-        if len(a)!=1:
-            print('~!~!~!~!~~NO DATA FOUND~~!~!~!~!~')
-            
-        else:
-            print('')
-            print('''
-            ------------------------    
-            | YOUR OLD DETAILS ARE |
-            ------------------------
-            ''')
-            
-            print("")
-            print("""     Adhaar no.:-""",i[0])
-            print('''     Name:-''',i[1])
-            print('''     Age:-''',i[2])
-            print('''     Gender:-''',i[3])
-            print('''     Phone:-''',i[4])
-            print('''     Bloodgroup:-''',i[5])
-            n=input('ENTER NEW AGE:-')
-            cur.execute('update appt set age=(%s) where idno=(%s);',(n,adr,))
-            con.commit()
-            cur.execute('select * from appt where idno=(%s)',(adr,))
-            dat=cur.fetchall()
-            for row in dat:
-                print('')
-                print('''
-           ------------------------      
-           | YOU NEW DETAILS ARE  |
-           ------------------------      
-                ''')
-                print('')                
-                print("""     Adhaar no.:-""",row[0])
-                print('''     Name:-''',row[1])
-                print('''     Age:-''',row[2])
-                print('''     Gender:-''',row[3])
-                print('''     Phone:-''',row[4])
-                print('''     Bloodgroup:-''',row[5])
-                con.commit()
-        return("")
-    
-  def gen():
-        adr=int(input('ENTER YOUR ADHAAR NO:'))
-        cur.execute('select * from appt where idno=(%s)',(adr,))
-        dat=cur.fetchall()
-        a=[]
-        for i in dat:
-            a.append(i)
-            
-        if len(a)!=1:
-            print('~!~!~!~!~~NO DATA FOUND~~!~!~!~!~')
-            
-        else:
-            print('')
-            print('''
-            ------------------------    
-            | YOUR OLD DETAILS ARE |
-            ------------------------
-            ''')
-            
-            print("")
-            print("""     Adhaar no.:-""",i[0])
-            print('''     Name:-''',i[1])
-            print('''     Age:-''',i[2])
-            print('''     Gender:-''',i[3])
-            print('''     Phone:-''',i[4])
-            print('''     Bloodgroup:-''',i[5])
-            n=input('ENTER NEW GENDER:-')
-            cur.execute('update appt set gender=(%s) where idno=(%s);',(n,adr,))
-            con.commit()
-            cur.execute('select * from appt where idno=(%s)',(adr,))
-            dat=cur.fetchall()
-            for row in dat:
-                print('')
-                print('''
-           ------------------------      
-           | YOU NEW DETAILS ARE  |
-           ------------------------      
-                ''')
-                print('')                
-                print("""     Adhaar no.:-""",row[0])
-                print('''     Name:-''',row[1])
-                print('''     Age:-''',row[2])
-                print('''     Gender:-''',row[3])
-                print('''     Phone:-''',row[4])
-                print('''     Bloodgroup:-''',row[5])
-                con.commit()
-        return("")         
-
-
-  def ph():
-        adr=int(input('ENTER YOUR ADHAAR NO:'))
-        cur.execute('select * from appt where idno=(%s)',(adr,))
-        dat=cur.fetchall()
-        a=[]
-        for i in dat:
-            a.append(i)
-            
-        if len(a)!=1:
-            print('~!~!~!~!~~NO DATA FOUND~~!~!~!~!~')
-            
-        else:
-            print('')
-            print('''
-            ------------------------    
-            | YOUR OLD DETAILS ARE |
-            ------------------------
-            ''')
-            
-            print("")
-            print("""     Adhaar no.:-""",i[0])
-            print('''     Name:-''',i[1])
-            print('''     Age:-''',i[2])
-            print('''     Gender:-''',i[3])
-            print('''     Phone:-''',i[4])
-            print('''     Bloodgroup:-''',i[5])
-            n=input('ENTER NEW PHONE NO:-')
-            cur.execute('update appt set phone=(%s) where idno=(%s);',(n,adr,))
-            con.commit()
-            cur.execute('select * from appt where idno=(%s)',(adr,))
-            dat=cur.fetchall()
-            for row in dat:
-                print('')
-                print('''
-           ------------------------      
-           | YOU NEW DETAILS ARE  |
-           ------------------------      
-                ''')
-                print('')                
-                print("""     Adhaar no.:-""",row[0])
-                print('''     Name:-''',row[1])
-                print('''     Age:-''',row[2])
-                print('''     Gender:-''',row[3])
-                print('''     Phone:-''',row[4])
-                print('''     Bloodgroup:-''',row[5])
-                con.commit()
-        return("")
-
-
-  def bg():
-        adr=int(input('ENTER YOUR ADHAAR NO:'))
-        cur.execute('select * from appt where idno=(%s)',(adr,))
-        dat=cur.fetchall()
-        a=[]
-        for i in dat:
-            a.append(i)
-            
-        if len(a)!=1:
-            print('~!~!~!~!~~NO DATA FOUND~~!~!~!~!~')
-            
-        else:
-            print('')
-            print('''
-            ------------------------    
-            | YOUR OLD DETAILS ARE |
-            ------------------------
-            ''')
-            
-            print("")
-            print("""     Adhaar no.:-""",i[0])
-            print('''     Name:-''',i[1])
-            print('''     Age:-''',i[2])
-            print('''     Gender:-''',i[3])
-            print('''     Phone:-''',i[4])
-            print('''     Bloodgroup:-''',i[5])
-            n=input('ENTER NEW BLOOD GROUP:-')
-            cur.execute('update appt set bg=(%s) where idno=(%s);',(n,adr,))
-            con.commit()
-            cur.execute('select * from appt where idno=(%s)',(adr,))
-            dat=cur.fetchall()
-            for row in dat:
-                print('')
-                print('''
-           ------------------------      
-           | YOU NEW DETAILS ARE  |
-           ------------------------      
-                ''')
-                print('')                
-                print("""     Adhaar no.:-""",row[0])
-                print('''     Name:-''',row[1])
-                print('''     Age:-''',row[2])
-                print('''     Gender:-''',row[3])
-                print('''     Phone:-''',row[4])
-                print('''     Bloodgroup:-''',row[5])
-                con.commit()
-        return("") 
-
-
-
   def ret():
-        adr=int(input('Enter Adhaar no:'))
-        cur.execute('select * from appt where idno=(%s)',(adr,))
-        dat=cur.fetchall()
-        a=[]
-        for i in dat:
-            a.append(i)
-        if len(a)!=1:
+        adr=input('Enter Adhaar no:').strip()
+        cur.execute('select idno from appt where idno=(%s)',(adr,))
+        if cur.fetchone() is None:
             print('')
             print('~!~!~!~!~~NO DATA FOUND~~!~!~!~!~')
             
@@ -461,74 +649,15 @@ while True:
                 
                  x=int(input("Enter choice:-"))
                 
-                 if x==1:
-                    i=("Dr. Varun \nRoom no:- 201")
-                    j=("Dr. Hrithik \nRoom no:- 202")
-                    q=(i,j)
-                    h=rd.choice(q)
-                    print(" ")
-                    print("Your appointment is fixed with",h,"\nDate:-",datetime.date.today() + datetime.timedelta(days=3))
-                    u=(12,43,54,71,32,65)
-                    o=rd.choice(u)
-                    print("Appointment no:-",o)
-                    break
-                 elif x==2:
-                    i=("Dr. Sidharth \nRoom no. 207")
-                    j=("Dr. Abhishek \nRoom no. 208")
-                    q=(i,j)
-                    h=rd.choice(q)
-                    print(" ")
-                    print("Your appointment is fixed with",h,"Date:-",datetime.date.today() + datetime.timedelta(days=5))
-                    u=(12,43,54,71,32,65)
-                    o=rd.choice(u)
-                    print("Appointment no:-",o)
-                    break
-               
-                 elif x==3:
-                    i=("Dr. Salman \nRoom no. 203")
-                    j=("Dr. Shahrukh \nRoom no. 204")
-                    q=(i,j)
-                    h=rd.choice(q)
-                    print(' ')
-                    print("Your appointment is fixed with",h,"Date:-",datetime.date.today() + datetime.timedelta(days=3))
-                    u=(12,43,54,71,32,65)
-                    o=rd.choice(u)
-                    print("Appointment no:-",o)
-                    break
-                 elif x==4:
-                    i=("Dr. Ajay, \nRoom no. 209")
-                    j=("Dr. Ranveer \nRoom no. 200")
-                    q=(i,j)
-                    h=rd.choice(q)
-                    print(' ')
-                    print("Your appointment is fixed with",h,"Date:-",datetime.date.today() + datetime.timedelta(days=6))
-                    u=(12,43,54,71,32,65)
-                    o=rd.choice(u)
-                    print("Appointment no:-",o)
-                    break
-                 elif x==5:
-                    i=("Dr. Akshay \nRoom no. 205")
-                    j=("Dr. Amir \nRoom no. 206")
-                    q=(i,j)
-                    h=rd.choice(q)
-                    print(' ')
-                    print("Your appointment is fixed with",h,"Date:-",datetime.date.today() + datetime.timedelta(days=4))
-                    u=(12,43,54,71,32,65)
-                    o=rd.choice(u)
-                    print("Appointment no:-:",o)
-                    break
-                 elif x==6:
-                    i=("Dr. Irfan \nRoom no. 001")
-                    j=("Dr. John \nRoom no. 002")
-                    k=("Dr. Sanjay \nRoom no. 003")
-                    l=("Dr. Shahid \nRoom no. 004")
-                    q=(i,j,k,l)
-                    h=rd.choice(q)
+                 if 1<=x<=len(DEPARTMENTS):
+                    fixed=book(adr,DEPARTMENTS[x-1][0])
                     print(" ")
-                    print("Your appointment is fixed with",h,"Date:-",datetime.date.today() + datetime.timedelta(days=1))
-                    u=(12,43,54,71,32,65)
-                    o=rd.choice(u)
-                    print("Appointment no:-",o)
+                    if fixed is None:
+                        print("~!~!~!~~NO FREE SLOT IN THE NEXT YEAR, PLEASE CONTACT THE HOSPITAL~~!~!~!~")
+                    else:
+                        o,name,room,day,slot=fixed
+                        print("Your appointment is fixed with Dr.",name,"\nRoom no:-",room,"\nDate:-",day,"\nSlot no:-",slot)
+                        print("Appointment no:-",o)
                     break
                 
                  elif x==7:
@@ -541,22 +670,6 @@ while True:
             
                 
     
-  l={"NAME OF DOCTOR":["Dr. Varun","Dr. Hrithik","Dr. Salman","Dr. Shahrukh","Dr. Akshay","Dr. Amir","Dr. Sidharth","Dr. Abhishek","Dr. Ajay",
-                     "Dr. Ranveer",'Dr. Irfan','Dr. John','Dr. Sanjay','Dr. Shahid'],
-   "DEPARTMENT":["Cardiologist","Cardiologist","Psychitrist","Psychitrist","Otolaryngonologist","Otolaryngonologist","Rheumatologist","Rheumatologist","Neurologist",
-                 "Neurologist",'MI room','MI room','MI room','MI room'],
-   "ROOM NO.":[201,202,203,204,205,206,207,208,209,200,401,402,403,404]}
-  df=pd.DataFrame(l)
-  df=df.rename(index={0:1,1:2,2:3,3:4,4:5,5:6,6:7,7:8,8:9,9:10,10:11,11:12,12:13,13:14})
-
-
-  f={"Services":["X-Ray","MRI","CT Scan","Endoscopy","Dialysis","Ultrasound ","EEG","ENMG","ECG"],
-   "Room no.":[101,102,103,104,105,301,302,303,304]}
-  dt=pd.DataFrame(f) 
-  dt=dt.rename(index={0:1,1:2,2:3,3:4,4:5,5:6,6:7,7:8,8:9})
-
-
-
   while True:
     print("""
     
@@ -591,14 +704,14 @@ while True:
        print(" ")
        print("-----FOLLOWING DOCTORS ARE AVAILABLE-----")
        print(" ")
-       print(df)
+       print(DIRECTORY)
           
     
     elif x==4:
        print(" ")
        print("-----FOLLOWING SERVICES ARE AVAILABLE------")
        print(" ")
-       print(dt)
+       print(SERVICES)
        print(' ')
        print("To avail any of these please contact on our no.:- 9211420420")
     
@@ -618,32 +731,31 @@ while True:
     |3.Gender                |
     |4.Phone no.             |
     |5.Blood group           |
-    |6.Back                  | 
+    |6.Several fields        |
+    |7.Corrections from file |
+    |8.Back                  | 
     |________________________|
            """)
                       
            s=int(input("ENTER YOUR CHOICE:-"))
 
-           if s==1:
-               print(name())
-               break
-
-           elif s==2:
-               print(age())
+           if 1<=s<=5:
+               print(edit([COLUMNS[s]]))
                break
 
-           elif s==3:
-               print(gen())
+           elif s==6:
+               picks=input("ENTER CHOICES SEPARATED BY COMMAS (e.g. 1,4):-")
+               cols=[COLUMNS[int(p)] for p in picks.split(",") if p.strip() in ("1","2","3","4","5")]
+               if cols:
+                   print(edit(list(dict.fromkeys(cols))))
+                   break
+               print("~!~!~!~WRONG CHOICE PLEASE ENTER VALID VALUE~!~!~!~")
+
+           elif s==7:
+               print(batch_edit(input("CORRECTIONS FILE (CSV/JSONL):-").strip()))
                break
-
-           elif s==4:
-               print(ph())
-               break 
-           
-           elif s==5:
-               print(bg())
                
-           elif s==6:
+           elif s==8:
                break
                
            else:
@@ -664,327 +776,49 @@ while True:
      
  elif e=="2":
   
-  
-  d={"NAME OF PATIENT":["Amit","Sanjay","Vipul","Sayeed"],"AGE":[23,34,27,26],
-   "APPOINTMENT NO.":[64,52,12,56]}
-  d1=pd.DataFrame(d)
-  d1=d1.rename(index={0:1,1:2,2:3,3:4})
-
-  g={"NAME OF PATIENT":["Ankit","Sanjeev","Vikas","Shoib",'Rehan','Suarav','Ganpat'],"AGE":[12,45,21,23,34,27,26],
-   "APPOINTMENT NO.":[3,82,12,31,54,39,46]}
-  d2=pd.DataFrame(g)
-  d2=d2.rename(index={0:1,1:2,2:3,3:4,4:5,5:6,6:7})
-
-  f={"NAME OF PATIENT":["Tanay","Ajay","Akaash","Shakib","Rohan",'Raju','Farhan','Bhuvan'],"AGE":[42,58,32,67,23,34,27,26],
-   "APPOINTMENT NO.":[43,23,61,32,21,43,56,31]}
-  d3=pd.DataFrame(f)
-  d3=d3.rename(index={0:1,1:2,2:3,3:4,4:5,5:6,6:7,7:8})
-
-  h={"NAME OF PATIENT":["Ashish","Joy","Jayesh","Somesh","Rahul",'Arham','Bhanu','Danish'],"AGE":[42,58,32,67,23,34,27,26],
-   "APPOINTMENT NO.":[43,23,61,32,21,43,56,31]}
-  d4=pd.DataFrame(h)
-  d4=d4.rename(index={0:1,1:2,2:3,3:4,4:5,5:6,6:7,7:8})
-
-  s={"NAME OF PATIENT":["Manav","Dheeraj","Kamal","Sohrab","Yash"],"AGE":[12,23,34,27,26],
-   "APPOINTMENT NO.":[64,57,22,12,56]}
-  d5=pd.DataFrame(s)
-  d5=d5.rename(index={0:1,1:2,2:3,3:4,4:5})
-
-  i={"NAME OF PATIENT":["Umesh",'Kamal','Pankaj','Dhyanesh','Arnav'],"AGE":[12,23,34,27,26],
-   "APPOINTMENT NO.":[64,57,22,12,56]}
-  d6=pd.DataFrame(i)
-  d6=d6.rename(index={0:1,1:2,2:3,3:4,4:5})
-
   while True:
     print('')
-    e=input("ENTER YOUR ID NO. (press enter to exit):-")
+    e=input("ENTER YOUR ID NO. (press enter to exit):-").strip()
     print(" ")
-    if e=="1":
-      w=7001
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==w:
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            
-            print("|||   GOOD EVENING MR. VARUN   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. VARUN   |||")
-        print(" ")
-        print(""" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-""")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
-
-    elif e=="2":
-      w=7002
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==w: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. HRITHIK   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. HRITHIK   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)    
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
-
-        
-    elif e=='3':
-      z=7003
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. SALMAN   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. SALMAN    |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)  
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')  
-
-    elif e=='4':
-      z=7004
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. SHAHRUKH   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. SHAHRUKH   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)    
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')  
-  
-        
-    elif e=='5':
-      z=7005
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. AKSHAY   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. AKSHAY   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')  
-  
-        
-    elif e=='6':
-      z=7006
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. AMIR   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. AMIR    |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)  
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')  
-        
-    elif e=='7':
-      z=7007
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. SIDHARTH   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. SIDHARTH   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~') 
-        
-    elif e=='8':
-      z=7008
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. ABHISHEK   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. ABHISHEK   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~') 
-        
-    elif e=='9':
-      z=7009
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. AJAY   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. AJAY   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
-        
-    elif e=='10':
-      z=7010
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. RANVEER   |||")
-
-        else:
-            print("|||   GOOD MORNING MR. RANVEER   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
-        
-    elif e=='11':
-      z=7011
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. IRFAN   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. IRFAN   |||")
-        print(" ")            
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o) 
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
-        
-    elif e=='12':
-      z=7012
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. JOHN   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. JOHN   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
-        
-    elif e=='13':
-      z=7013
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. SANJAY   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. SANJAY   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o) 
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
-        
-    elif e=='14':
-      z=7014
-      pswd=int(input('ENTER PASSWORD:'))
-      if pswd==z: 
-        t=datetime.datetime.now()
-        l=t.strftime("%p")
-        if l=="PM":
-            print("|||   GOOD EVENING MR. SHAHID   |||")
-            
-        else:
-            print("|||   GOOD MORNING MR. SHAHID   |||")
-        print(" ")    
-        print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
-        print("")
-        q=(d1,d2,d3,d4,d5,d6)
-        o=rd.choice(q)
-        print(o)
-      else:
-           print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
-     
+    if e=="":
+        break
+    pswd=input('ENTER PASSWORD:').strip()
+    cur.execute("select doc_id,name,password from doctors where doc_id=%s",(int(e) if e.isdigit() else 0,))
+    doc=cur.fetchone()
+    if doc is None or str(doc[2])!=pswd:
+        print('~!~!~!~~PASSWORD OR ID IS WRONG~~!~!~!~')
+        continue
+    login(doc[0])
+    t=datetime.datetime.now()
+    l=t.strftime("%p")
+    if l=="PM":
+        print("|||   GOOD EVENING MR.",doc[1].upper(),"  |||")
     else:
-        break    
+        print("|||   GOOD MORNING MR.",doc[1].upper(),"  |||")
+    print(" ")
+    print(" YOU HAVE APPOINTMENT WITH FOLLOWING PATIENTS:-")
+    print("")
+    show_roster(roster(doc[0],datetime.date.today()))
+
+    while True:
+      print("""
+    ____________________________
+    |                          |
+    |1.Today's patients        |
+    |2.Tomorrow's patients     |
+    |3.Logout                  |
+    |__________________________|
+      """)
+      c=input("ENTER YOUR CHOICE:-").strip()
+      print(" ")
+      if c=="1":
+          show_roster(roster(doc[0],datetime.date.today()))
+      elif c=="2":
+          show_roster(roster(doc[0],datetime.date.today()+datetime.timedelta(days=1)))
+      elif c=="3":
+          break
+      else:
+          print("~!~!~!~WRONG CHOICE PLEASE ENTER VALID VALUE~!~!~!~")
          
                         
  elif e=="3":
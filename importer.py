@@ -0,0 +1,185 @@
+import csv, io, json, re, time
+
+# Streaming bulk import. Rows are parsed one at a time from the upload,
+# validated, and written with executemany() in chunked transactions, so a
+# file of any size runs in constant memory.
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_REJECTS = 1000
+
+# Uploads are decoded with errors='surrogateescape': bytes that are not
+# UTF-8 come through as lone surrogates, so the line holding them can be
+# rejected without stopping the import
+NOT_UTF8 = re.compile('[\udc80-\udcff]')
+
+
+class ImportFailed(Exception):
+    pass
+
+
+def _text(value, field, required=True):
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError(f"{field} is required")
+    return value or None
+
+
+def _int(value, field, low=0, high=None):
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a whole number")
+    if number < low or (high is not None and number > high):
+        raise ValueError(f"{field} out of range")
+    return number
+
+
+def _price(value, field):
+    try:
+        number = float(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number")
+    if number < 0:
+        raise ValueError(f"{field} must not be negative")
+    return number
+
+
+def _patient(row):
+    gender = _text(row.get('gender'), 'gender', required=False)
+    if gender and gender not in ('Male', 'Female', 'Other'):
+        raise ValueError("gender must be Male, Female or Other")
+    return (_text(row.get('name'), 'name'), _int(row.get('age'), 'age', 0, 150), gender,
+            _text(row.get('phone'), 'phone', required=False),
+            _text(row.get('address'), 'address', required=False),
+            _text(row.get('disease'), 'disease', required=False))
+
+
+def _medicine(row):
+    return (_text(row.get('name'), 'name'), _int(row.get('quantity'), 'quantity'),
+            _price(row.get('price'), 'price'))
+
+
+def _bed(row):
+    availability = _text(row.get('availability'), 'availability', required=False) or 'available'
+    if availability not in ('available', 'occupied'):
+        raise ValueError("availability must be available or occupied")
+    patient_id = _text(row.get('patient_id'), 'patient_id', required=False)
+    if availability == 'available':
+        patient_id = None
+    return (_text(row.get('room_no'), 'room_no'), _text(row.get('bed_type'), 'bed_type'),
+            availability, patient_id)
+
+
+def _canteen_item(row):
+    return (_text(row.get('name'), 'name'), _price(row.get('price'), 'price'))
+
+
+KINDS = {
+    'patients': ("INSERT INTO patients (name, age, gender, phone, address, disease) VALUES (?, ?, ?, ?, ?, ?)",
+                 _patient),
+    'medicines': ("INSERT INTO medicines (name, quantity, price) VALUES (?, ?, ?)", _medicine),
+    'beds': ("INSERT INTO facilities (room_no, bed_type, availability, patient_id) VALUES (?, ?, ?, ?)", _bed),
+    'canteen_items': ("INSERT INTO canteen_items (name, price) VALUES (?, ?)", _canteen_item),
+}
+
+
+def detect_format(filename, fmt=None):
+    if fmt:
+        fmt = fmt.lower()
+    elif filename and filename.lower().endswith(('.jsonl', '.ndjson')):
+        fmt = 'jsonl'
+    else:
+        fmt = 'csv'
+    if fmt not in ('csv', 'jsonl'):
+        raise ImportFailed(f"unsupported format {fmt!r} (csv or jsonl)")
+    return fmt
+
+
+def _not_utf8(row):
+    values = list(row) + [v for value in row.values() for v in (value if isinstance(value, list) else [value])]
+    return any(isinstance(v, str) and NOT_UTF8.search(v) for v in values)
+
+
+def read_rows(stream, fmt):
+    # Yields (line_no, dict or None, error). `stream` may be binary or text.
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='surrogateescape', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        try:
+            for row in reader:
+                if _not_utf8(row):
+                    yield reader.line_num, None, "not valid UTF-8"
+                else:
+                    yield reader.line_num, row, None
+        except csv.Error as e:
+            raise ImportFailed(f"line {reader.line_num}: {e}")
+    else:
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            if NOT_UTF8.search(line):
+                yield line_no, None, "not valid UTF-8"
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, None, "invalid JSON"
+                continue
+            if isinstance(row, dict):
+                yield line_no, row, None
+            else:
+                yield line_no, None, "expected a JSON object"
+
+
+def run(conn, kind, stream, fmt='csv', chunk_size=CHUNK_SIZE, on_reject=None):
+    if kind not in KINDS:
+        raise ImportFailed(f"unknown import kind {kind!r}")
+    sql, validate = KINDS[kind]
+    started = time.perf_counter()
+    accepted = rejected = 0
+    rejects = []
+    chunk = []
+
+    def flush():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(sql, chunk)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        chunk.clear()
+
+    try:
+        for line_no, row, error in read_rows(stream, fmt):
+            if error is None:
+                try:
+                    chunk.append(validate(row))
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                rejected += 1
+                if len(rejects) < MAX_REPORTED_REJECTS:
+                    rejects.append(dict(line=line_no, error=error))
+                if on_reject:
+                    on_reject(line_no, row, error)
+                continue
+            accepted += 1
+            if len(chunk) >= chunk_size:
+                flush()
+    except ImportFailed as e:
+        # The file can't be read past this point; earlier chunks are committed
+        raise ImportFailed(f"{e} (stopped there, {accepted - len(chunk)} row(s) before it were imported)")
+    if chunk:
+        flush()
+
+    seconds = time.perf_counter() - started
+    return dict(
+        kind=kind,
+        accepted=accepted,
+        rejected=rejected,
+        rejects=rejects,
+        seconds=round(seconds, 3),
+        rows_per_sec=round(accepted / seconds) if seconds else accepted,
+    )
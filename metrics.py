@@ -0,0 +1,132 @@
+import bisect, threading, time
+from flask import g, request
+
+# In-process metrics in the Prometheus text format, served at /metrics.
+#
+# Recording is a lock plus a couple of list updates, cheap enough to leave
+# on. Each gunicorn worker keeps its own numbers (scrape every worker, or
+# sum them on the Prometheus side), and they reset when a worker restarts.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+REGISTRY = []
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join('{}="{}"'.format(n, str(v).replace('\\', r'\\').replace('"', r'\"'))
+                     for n, v in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # per-bucket counts (+Inf last), sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][slot] += 1
+            series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        names = self.labels + ('le',)
+        for labels, counts, total in items:
+            running = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                running += count
+                yield f"{self.name}_bucket{_labels(names, labels + (bound,))} {running}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {running}"
+
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds',
+                            'Time to build the response (first byte for streamed bodies).',
+                            ('endpoint', 'method'))
+REQUESTS = Counter('http_requests_total', 'Requests handled.', ('endpoint', 'method', 'status'))
+SQL_STATEMENTS = Histogram('db_statements_per_request', 'SQL statements issued by one request.',
+                           ('endpoint',), COUNT_BUCKETS)
+SQL_SECONDS = Histogram('db_statement_seconds_per_request', 'Time spent in SQL by one request.',
+                        ('endpoint',))
+COMMIT_SECONDS = Histogram('db_commit_seconds', 'Time taken by each commit (count = commits).')
+LOCK_WAIT_SECONDS = Histogram('db_lock_wait_seconds', 'Time waiting for the write lock (BEGIN IMMEDIATE).')
+POOL_WAIT_SECONDS = Histogram('db_pool_wait_seconds', 'Time waiting for a pooled connection.')
+STARTUP_SECONDS = Gauge('worker_startup_seconds', 'Cold start of this worker by phase.', ('phase',))
+GROUP_COMMIT_BATCH = Histogram('db_group_commit_batch_size', 'Writes committed together (GROUP_COMMIT).',
+                               buckets=COUNT_BUCKETS)
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# ---------------- Flask hooks ----------------
+
+def _start():
+    g.started = time.perf_counter()
+
+
+def _finish(response):
+    started = g.pop('started', None)
+    if started is None:
+        return response
+    endpoint = request.endpoint or 'unmatched'
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint, request.method)
+    REQUESTS.inc(endpoint, request.method, response.status_code)
+    cur = g.get('cur')
+    SQL_STATEMENTS.observe(cur.statements if cur is not None else 0, endpoint)
+    SQL_SECONDS.observe(cur.seconds if cur is not None else 0.0, endpoint)
+    return response
+
+
+def init_app(app):
+    app.before_request(_start)
+    app.after_request(_finish)
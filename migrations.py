@@ -0,0 +1,425 @@
+import datetime, json, re, sqlite3
+
+# Ordered schema steps. Each one runs exactly once per database, inside its
+# own transaction, and is recorded in schema_version. Never edit a step that
+# has shipped -- append a new one instead. A step is either an SQL script
+# or a function taking the connection.
+#
+# Everything a step runs is written out in this file, not borrowed from the
+# module that uses the table: changing stats.py or revenue.py later must not
+# change what an old step does on a new database.
+
+BASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    age INTEGER,
+    gender TEXT,
+    phone TEXT,
+    address TEXT,
+    disease TEXT
+);
+
+CREATE TABLE IF NOT EXISTS doctors (
+    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    specialization TEXT,
+    phone TEXT,
+    email TEXT
+);
+
+CREATE TABLE IF NOT EXISTS nurses (
+    nurse_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    assigned_to INTEGER,
+    shift TEXT
+);
+
+CREATE TABLE IF NOT EXISTS medicines (
+    med_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    quantity INTEGER,
+    price REAL
+);
+
+CREATE TABLE IF NOT EXISTS facilities (
+    bed_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_no TEXT,
+    bed_type TEXT,
+    availability TEXT,
+    patient_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS canteen_items (
+    item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    price REAL
+);
+
+CREATE TABLE IF NOT EXISTS canteen_orders (
+    order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id TEXT,
+    items TEXT,
+    total REAL,
+    status TEXT,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS bills (
+    bill_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id TEXT,
+    items TEXT,
+    total REAL,
+    date TEXT
+);
+"""
+
+LIST_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_patients_name ON patients (name, patient_id);
+CREATE INDEX IF NOT EXISTS idx_doctors_name ON doctors (name, doc_id);
+CREATE INDEX IF NOT EXISTS idx_doctors_specialization ON doctors (specialization, name, doc_id);
+CREATE INDEX IF NOT EXISTS idx_nurses_name ON nurses (name, nurse_id);
+CREATE INDEX IF NOT EXISTS idx_medicines_name ON medicines (name, med_id);
+CREATE INDEX IF NOT EXISTS idx_medicines_quantity ON medicines (quantity, med_id);
+CREATE INDEX IF NOT EXISTS idx_facilities_room ON facilities (room_no, bed_id);
+"""
+
+HOT_FILTER_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_canteen_orders_created_at ON canteen_orders (created_at);
+CREATE INDEX IF NOT EXISTS idx_facilities_availability ON facilities (availability);
+CREATE INDEX IF NOT EXISTS idx_nurses_assigned_to ON nurses (assigned_to);
+CREATE INDEX IF NOT EXISTS idx_bills_patient_id ON bills (patient_id);
+"""
+
+FREE_BED_INDEX = """
+DROP INDEX IF EXISTS idx_facilities_availability;
+CREATE INDEX IF NOT EXISTS idx_facilities_free ON facilities (availability, bed_type, room_no);
+"""
+
+EXPORT_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_bills_date ON bills (date);
+"""
+
+STATS_V1 = """
+CREATE TABLE IF NOT EXISTS dashboard_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    patients INTEGER NOT NULL DEFAULT 0,
+    doctors INTEGER NOT NULL DEFAULT 0,
+    nurses INTEGER NOT NULL DEFAULT 0,
+    medicines INTEGER NOT NULL DEFAULT 0,
+    occupied_beds INTEGER NOT NULL DEFAULT 0,
+    available_beds INTEGER NOT NULL DEFAULT 0,
+    bills INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO dashboard_stats
+SELECT 1,
+    (SELECT COUNT(*) FROM patients),
+    (SELECT COUNT(*) FROM doctors),
+    (SELECT COUNT(*) FROM nurses),
+    (SELECT COUNT(*) FROM medicines),
+    (SELECT COUNT(*) FROM facilities WHERE availability='occupied'),
+    (SELECT COUNT(*) FROM facilities WHERE availability='available'),
+    (SELECT COUNT(*) FROM bills),
+    (SELECT COALESCE(SUM(total), 0) FROM bills)
+;
+
+CREATE TRIGGER IF NOT EXISTS stats_patients_ins AFTER INSERT ON patients BEGIN
+    UPDATE dashboard_stats SET patients = patients + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS stats_patients_del AFTER DELETE ON patients BEGIN
+    UPDATE dashboard_stats SET patients = patients - 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_doctors_ins AFTER INSERT ON doctors BEGIN
+    UPDATE dashboard_stats SET doctors = doctors + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS stats_doctors_del AFTER DELETE ON doctors BEGIN
+    UPDATE dashboard_stats SET doctors = doctors - 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_nurses_ins AFTER INSERT ON nurses BEGIN
+    UPDATE dashboard_stats SET nurses = nurses + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS stats_nurses_del AFTER DELETE ON nurses BEGIN
+    UPDATE dashboard_stats SET nurses = nurses - 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_medicines_ins AFTER INSERT ON medicines BEGIN
+    UPDATE dashboard_stats SET medicines = medicines + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS stats_medicines_del AFTER DELETE ON medicines BEGIN
+    UPDATE dashboard_stats SET medicines = medicines - 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_facilities_ins AFTER INSERT ON facilities BEGIN
+    UPDATE dashboard_stats SET
+        occupied_beds = occupied_beds + (NEW.availability = 'occupied'),
+        available_beds = available_beds + (NEW.availability = 'available')
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS stats_facilities_del AFTER DELETE ON facilities BEGIN
+    UPDATE dashboard_stats SET
+        occupied_beds = occupied_beds - (OLD.availability = 'occupied'),
+        available_beds = available_beds - (OLD.availability = 'available')
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS stats_facilities_upd AFTER UPDATE OF availability ON facilities
+WHEN OLD.availability IS NOT NEW.availability BEGIN
+    UPDATE dashboard_stats SET
+        occupied_beds = occupied_beds - (OLD.availability = 'occupied') + (NEW.availability = 'occupied'),
+        available_beds = available_beds - (OLD.availability = 'available') + (NEW.availability = 'available')
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_bills_ins AFTER INSERT ON bills BEGIN
+    UPDATE dashboard_stats SET bills = bills + 1, revenue = revenue + COALESCE(NEW.total, 0) WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS stats_bills_del AFTER DELETE ON bills BEGIN
+    UPDATE dashboard_stats SET bills = bills - 1, revenue = revenue - COALESCE(OLD.total, 0) WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS stats_bills_upd AFTER UPDATE OF total ON bills BEGIN
+    UPDATE dashboard_stats SET revenue = revenue - COALESCE(OLD.total, 0) + COALESCE(NEW.total, 0) WHERE id = 1;
+END;
+"""
+
+TABLE_VERSIONS_V1 = """
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def _version_triggers_v1(table):
+    sql = f"INSERT OR IGNORE INTO table_versions (name) VALUES ('{table}');\n"
+    for event, tag in (("INSERT", "ins"), ("UPDATE", "upd"), ("DELETE", "del")):
+        sql += (
+            f"CREATE TRIGGER IF NOT EXISTS version_{table}_{tag} AFTER {event} ON {table} BEGIN\n"
+            f"    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';\n"
+            f"END;\n"
+        )
+    return sql
+
+
+BILL_LINES_V1 = """
+CREATE TABLE IF NOT EXISTS bill_lines (
+    line_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bill_id INTEGER,
+    order_id INTEGER,
+    source TEXT NOT NULL,
+    item TEXT,
+    item_id INTEGER,
+    qty INTEGER NOT NULL DEFAULT 1,
+    amount REAL NOT NULL DEFAULT 0,
+    day TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bill_lines_bill ON bill_lines (bill_id);
+CREATE INDEX IF NOT EXISTS idx_bill_lines_order ON bill_lines (order_id);
+CREATE INDEX IF NOT EXISTS idx_bill_lines_day ON bill_lines (day, source, amount);
+CREATE INDEX IF NOT EXISTS idx_bill_lines_item ON bill_lines (source, item, qty, amount);
+"""
+
+_INSERT_LINE_V1 = ("INSERT INTO bill_lines (bill_id, order_id, source, item, item_id, qty, amount, day) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_MEDICINE_DESC_V1 = re.compile(r"^Medicine: (.*) x(\d+)$")
+
+
+def _loads(blob):
+    try:
+        items = json.loads(blob or '[]')
+    except ValueError:
+        return []
+    return [i for i in items if isinstance(i, dict)] if isinstance(items, list) else []
+
+
+def _day(stamp):
+    return (stamp or datetime.date.today().isoformat())[:10]
+
+
+def backfill_bill_lines_v1(conn):
+    # Explode the JSON blobs stored before bill_lines existed, the way
+    # revenue.py wrote lines when this step shipped.
+    for bill in conn.execute("SELECT bill_id, items, date FROM bills"):
+        lines = _loads(bill['items'])
+        pharmacy = bool(lines) and all(_MEDICINE_DESC_V1.match(l.get('desc') or '') for l in lines)
+        rows = []
+        for l in lines:
+            item, qty = l.get('item'), l.get('qty')
+            if item is None:
+                m = _MEDICINE_DESC_V1.match(l.get('desc') or '') if pharmacy else None
+                item, qty = (m.group(1), int(m.group(2))) if m else (l.get('desc'), qty)
+            rows.append((bill['bill_id'], None, 'pharmacy' if pharmacy else 'billing', item, l.get('item_id'),
+                         qty or 1, float(l.get('amount') or 0), _day(bill['date'])))
+        conn.executemany(_INSERT_LINE_V1, rows)
+    for order in conn.execute("SELECT order_id, items, created_at FROM canteen_orders"):
+        conn.executemany(_INSERT_LINE_V1, [
+            (None, order['order_id'], 'canteen', i.get('name'), i.get('item_id'), i.get('qty') or 1,
+             float(i.get('subtotal') or 0), _day(order['created_at'])) for i in _loads(order['items'])])
+
+
+PATIENT_SEARCH_V1 = """
+CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+    name, disease, phone, address,
+    content='patients', content_rowid='patient_id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS patients_fts_ins AFTER INSERT ON patients BEGIN
+    INSERT INTO patients_fts (rowid, name, disease, phone, address)
+    VALUES (NEW.patient_id, NEW.name, NEW.disease, NEW.phone, NEW.address);
+END;
+CREATE TRIGGER IF NOT EXISTS patients_fts_del AFTER DELETE ON patients BEGIN
+    INSERT INTO patients_fts (patients_fts, rowid, name, disease, phone, address)
+    VALUES ('delete', OLD.patient_id, OLD.name, OLD.disease, OLD.phone, OLD.address);
+END;
+CREATE TRIGGER IF NOT EXISTS patients_fts_upd AFTER UPDATE ON patients BEGIN
+    INSERT INTO patients_fts (patients_fts, rowid, name, disease, phone, address)
+    VALUES ('delete', OLD.patient_id, OLD.name, OLD.disease, OLD.phone, OLD.address);
+    INSERT INTO patients_fts (rowid, name, disease, phone, address)
+    VALUES (NEW.patient_id, NEW.name, NEW.disease, NEW.phone, NEW.address);
+END;
+
+INSERT INTO patients_fts (patients_fts) VALUES ('rebuild');
+
+CREATE INDEX IF NOT EXISTS idx_patients_phone ON patients (phone);
+"""
+
+# Tables that got version triggers after canteen_items (step 5)
+API_VERSIONED_TABLES = ('patients', 'doctors', 'nurses', 'medicines', 'facilities', 'canteen_orders', 'bills')
+
+API_VERSIONS = TABLE_VERSIONS_V1 + "".join(_version_triggers_v1(t) for t in API_VERSIONED_TABLES) + """
+CREATE INDEX IF NOT EXISTS idx_canteen_items_name ON canteen_items (name, item_id);
+"""
+
+# Revenue as a running REAL total picked up rounding error with every bill
+# and never lost it; whole paise add up exactly.
+STATS_PAISE = """
+DROP TRIGGER IF EXISTS stats_bills_ins;
+DROP TRIGGER IF EXISTS stats_bills_del;
+DROP TRIGGER IF EXISTS stats_bills_upd;
+DROP TABLE IF EXISTS dashboard_stats;
+
+CREATE TABLE dashboard_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    patients INTEGER NOT NULL DEFAULT 0,
+    doctors INTEGER NOT NULL DEFAULT 0,
+    nurses INTEGER NOT NULL DEFAULT 0,
+    medicines INTEGER NOT NULL DEFAULT 0,
+    occupied_beds INTEGER NOT NULL DEFAULT 0,
+    available_beds INTEGER NOT NULL DEFAULT 0,
+    bills INTEGER NOT NULL DEFAULT 0,
+    revenue_paise INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO dashboard_stats
+SELECT 1,
+    (SELECT COUNT(*) FROM patients),
+    (SELECT COUNT(*) FROM doctors),
+    (SELECT COUNT(*) FROM nurses),
+    (SELECT COUNT(*) FROM medicines),
+    (SELECT COUNT(*) FROM facilities WHERE availability='occupied'),
+    (SELECT COUNT(*) FROM facilities WHERE availability='available'),
+    (SELECT COUNT(*) FROM bills),
+    (SELECT COALESCE(SUM(CAST(ROUND(total * 100) AS INTEGER)), 0) FROM bills);
+
+CREATE TRIGGER stats_bills_ins AFTER INSERT ON bills BEGIN
+    UPDATE dashboard_stats SET bills = bills + 1,
+        revenue_paise = revenue_paise + CAST(ROUND(COALESCE(NEW.total, 0) * 100) AS INTEGER)
+    WHERE id = 1;
+END;
+CREATE TRIGGER stats_bills_del AFTER DELETE ON bills BEGIN
+    UPDATE dashboard_stats SET bills = bills - 1,
+        revenue_paise = revenue_paise - CAST(ROUND(COALESCE(OLD.total, 0) * 100) AS INTEGER)
+    WHERE id = 1;
+END;
+CREATE TRIGGER stats_bills_upd AFTER UPDATE OF total ON bills BEGIN
+    UPDATE dashboard_stats SET
+        revenue_paise = revenue_paise - CAST(ROUND(COALESCE(OLD.total, 0) * 100) AS INTEGER)
+                                      + CAST(ROUND(COALESCE(NEW.total, 0) * 100) AS INTEGER)
+    WHERE id = 1;
+END;
+"""
+
+MIGRATIONS = [
+    (1, "base schema", BASE_SCHEMA),
+    (2, "dashboard stats", STATS_V1),
+    (3, "list page indexes", LIST_INDEXES),
+    (4, "hot filter indexes", HOT_FILTER_INDEXES),
+    (5, "table versions", TABLE_VERSIONS_V1 + _version_triggers_v1("canteen_items")),
+    (6, "free bed index", FREE_BED_INDEX),
+    (7, "bill date index", EXPORT_INDEXES),
+    (8, "bill lines", BILL_LINES_V1),
+    (9, "backfill bill lines", backfill_bill_lines_v1),
+    (10, "patient search", PATIENT_SEARCH_V1),
+    (11, "version counters for all tables", API_VERSIONS),
+    (12, "dashboard revenue in paise", STATS_PAISE),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at TEXT
+        )
+    """)
+    conn.commit()
+
+
+def current_version(conn):
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) AS v FROM schema_version").fetchone()
+    return row["v"] or 0
+
+
+def latest_version():
+    return MIGRATIONS[-1][0]
+
+
+def pending(conn):
+    done = current_version(conn)
+    return [m for m in MIGRATIONS if m[0] > done]
+
+
+def _statements(script):
+    # executescript() commits whatever is open before it runs, which would
+    # drop the write lock, so scripts are fed one statement at a time
+    buf = ''
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            yield buf
+            buf = ''
+    if buf.strip():
+        yield buf
+
+
+def migrate(conn):
+    # Returns the (version, name) of every step applied by this call.
+    # Workers may start migrating the same database at once: each step
+    # takes the write lock first and is skipped if another process
+    # recorded it in the meantime.
+    applied = []
+    for version, name, step in pending(conn):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            if callable(step):
+                step(conn)
+            else:
+                for statement in _statements(step):
+                    conn.execute(statement)
+            conn.execute("INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                         (version, name, datetime.datetime.now().isoformat()))
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append((version, name))
+    return applied
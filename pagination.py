@@ -0,0 +1,113 @@
+import base64, json, re
+from flask import request, jsonify
+
+from db import query_all
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        return None
+    # Only plain scalars can be bound as parameters; anything else is a
+    # tampered cursor and means the first page
+    if not isinstance(values, list) or not all(v is None or isinstance(v, (str, int, float)) for v in values):
+        return None
+    return values
+
+
+def page_size():
+    try:
+        size = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+class Page:
+    def __init__(self, rows, sort, sorts, limit, next_cursor=None, prev_cursor=None):
+        self.rows = rows
+        self.sort = sort
+        self.sorts = sorts
+        self.limit = limit
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def as_json(self):
+        return jsonify(
+            rows=[dict(r) for r in self.rows],
+            sort=self.sort,
+            limit=self.limit,
+            next=self.next_cursor,
+            prev=self.prev_cursor,
+        )
+
+
+def keyset(select_sql, sorts, default, params=()):
+    # Cursor (keyset) pagination: instead of OFFSET, each page continues from
+    # the sort key of the last row shown, so every page is one index seek no
+    # matter how deep it is.
+    #
+    # `sorts` maps a sort name to (key columns, descending). The last key
+    # column must be unique (the primary key) so cursors are unambiguous.
+    sort = request.args.get('sort', default)
+    if sort not in sorts:
+        sort = default
+    keys, descending = sorts[sort]
+    limit = page_size()
+
+    after = decode_cursor(request.args.get('after', ''))
+    before = None if after else decode_cursor(request.args.get('before', ''))
+    cursor = after or before
+    if cursor is not None and len(cursor) != len(keys):
+        cursor = after = before = None
+
+    # Walking backwards = flip the comparison and ORDER BY, then reverse.
+    backwards = before is not None
+    forward_desc = descending != backwards
+    sql = select_sql
+    args = list(params)
+    if cursor is not None:
+        op = '<' if forward_desc else '>'
+        cols = ', '.join(keys)
+        marks = ', '.join('?' * len(keys))
+        joiner = ' AND ' if re.search(r'\bWHERE\b', select_sql, re.I) else ' WHERE '
+        sql += f"{joiner}({cols}) {op} ({marks})"
+        args.extend(cursor)
+    direction = 'DESC' if forward_desc else 'ASC'
+    sql += ' ORDER BY ' + ', '.join(f"{k} {direction}" for k in keys)
+    sql += ' LIMIT ?'
+    args.append(limit + 1)
+
+    rows = query_all(sql, args)
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    fields = [k.rsplit('.', 1)[-1] for k in keys]
+    first = [rows[0][f] for f in fields] if rows else None
+    last = [rows[-1][f] for f in fields] if rows else None
+    if backwards:
+        next_cursor = encode_cursor(last) if rows else None
+        prev_cursor = encode_cursor(first) if more else None
+    else:
+        next_cursor = encode_cursor(last) if more else None
+        prev_cursor = encode_cursor(first) if after and rows else None
+    return Page(rows, sort, list(sorts), limit, next_cursor, prev_cursor)
+
+
+def wants_json():
+    return request.args.get('format') == 'json'
@@ -0,0 +1,63 @@
+from collections import namedtuple
+
+from pagination import keyset
+
+# Listings shared by the HTML pages and the JSON API. `sorts` maps a sort
+# name to (key columns, descending) for keyset pagination, ending on the
+# primary key; `tables` are the tables whose version decides the ETag.
+
+Resource = namedtuple('Resource', 'name table key select sorts default tables')
+
+PATIENTS = Resource(
+    'patients', 'patients', 'patient_id', "SELECT * FROM patients", {
+        'newest': (('patient_id',), True),
+        'oldest': (('patient_id',), False),
+        'name': (('name', 'patient_id'), False),
+    }, 'newest', ('patients',))
+
+DOCTORS = Resource(
+    'doctors', 'doctors', 'doc_id', "SELECT * FROM doctors", {
+        'name': (('name', 'doc_id'), False),
+        'specialization': (('specialization', 'name', 'doc_id'), False),
+    }, 'name', ('doctors',))
+
+NURSES = Resource(
+    'nurses', 'nurses', 'nurse_id', """
+        SELECT n.nurse_id, n.name, n.shift, n.assigned_to, d.name as doctor_name
+        FROM nurses n LEFT JOIN doctors d ON n.assigned_to = d.doc_id
+    """, {
+        'name': (('n.name', 'n.nurse_id'), False),
+    }, 'name', ('nurses', 'doctors'))
+
+MEDICINES = Resource(
+    'medicines', 'medicines', 'med_id', "SELECT * FROM medicines", {
+        'name': (('name', 'med_id'), False),
+        'stock': (('quantity', 'med_id'), False),
+    }, 'name', ('medicines',))
+
+FACILITIES = Resource(
+    'facilities', 'facilities', 'bed_id', "SELECT * FROM facilities", {
+        'room': (('room_no', 'bed_id'), False),
+    }, 'room', ('facilities',))
+
+CANTEEN_ITEMS = Resource(
+    'canteen/items', 'canteen_items', 'item_id', "SELECT * FROM canteen_items", {
+        'name': (('name', 'item_id'), False),
+    }, 'name', ('canteen_items',))
+
+CANTEEN_ORDERS = Resource(
+    'canteen/orders', 'canteen_orders', 'order_id', "SELECT * FROM canteen_orders", {
+        'newest': (('order_id',), True),
+    }, 'newest', ('canteen_orders',))
+
+BILLS = Resource(
+    'bills', 'bills', 'bill_id', "SELECT * FROM bills", {
+        'newest': (('bill_id',), True),
+    }, 'newest', ('bills',))
+
+ALL = {r.name: r for r in (PATIENTS, DOCTORS, NURSES, MEDICINES, FACILITIES,
+                           CANTEEN_ITEMS, CANTEEN_ORDERS, BILLS)}
+
+
+def page(resource):
+    return keyset(resource.select, resource.sorts, resource.default)
@@ -0,0 +1,68 @@
+import re
+
+from db import query_all
+
+# Normalized line items. bills.items / canteen_orders.items keep their JSON
+# copy for existing readers; every line is also written to bill_lines so
+# revenue questions are plain indexed GROUP BYs.
+
+SOURCES = ('billing', 'pharmacy', 'canteen')
+
+# Table: migrations.py (BILL_LINES_V1).
+
+INSERT_LINE = ("INSERT INTO bill_lines (bill_id, order_id, source, item, item_id, qty, amount, day) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+MEDICINE_DESC = re.compile(r"^Medicine: (.*) x(\d+)$")
+
+
+def bill_line_rows(bill_id, source, lines, day):
+    # `lines` are the dicts stored in bills.items (desc, amount), optionally
+    # carrying item / item_id / qty for pharmacy sales.
+    rows = []
+    for l in lines:
+        item, qty = l.get('item'), l.get('qty')
+        if item is None:
+            m = MEDICINE_DESC.match(l.get('desc') or '') if source == 'pharmacy' else None
+            item, qty = (m.group(1), int(m.group(2))) if m else (l.get('desc'), qty)
+        rows.append((bill_id, None, source, item, l.get('item_id'), qty or 1, float(l.get('amount') or 0), day))
+    return rows
+
+
+def order_line_rows(order_id, items, day):
+    return [(None, order_id, 'canteen', i.get('name'), i.get('item_id'), i.get('qty') or 1,
+             float(i.get('subtotal') or 0), day) for i in items]
+
+
+# ---------------- Reports ----------------
+
+def _filters(start, end, source):
+    where, params = [], []
+    if start:
+        where.append("day >= ?")
+        params.append(start.isoformat())
+    if end:
+        where.append("day <= ?")
+        params.append(end.isoformat())
+    if source:
+        where.append("source = ?")
+        params.append(source)
+    return (" WHERE " + " AND ".join(where) if where else ""), params
+
+
+def by_day(start=None, end=None, source=None):
+    where, params = _filters(start, end, source)
+    return query_all(f"SELECT day, SUM(amount) AS revenue, COUNT(*) AS lines FROM bill_lines{where} "
+                     f"GROUP BY day ORDER BY day", params)
+
+
+def by_source(start=None, end=None):
+    where, params = _filters(start, end, None)
+    return query_all(f"SELECT source, SUM(amount) AS revenue, COUNT(*) AS lines FROM bill_lines{where} "
+                     f"GROUP BY source ORDER BY revenue DESC", params)
+
+
+def by_item(start=None, end=None, source=None, limit=50):
+    where, params = _filters(start, end, source)
+    return query_all(f"SELECT source, item, SUM(qty) AS qty, SUM(amount) AS revenue FROM bill_lines{where} "
+                     f"GROUP BY source, item ORDER BY revenue DESC LIMIT ?", params + [limit])
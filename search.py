@@ -0,0 +1,49 @@
+import re
+
+from db import query_all
+
+# Patient search. patients_fts is an external-content FTS5 index over
+# patients (no second copy of the text), kept in sync by triggers.
+# Phone numbers also get a plain B-tree index for exact lookups.
+
+# Index and triggers: migrations.py (PATIENT_SEARCH_V1).
+
+MAX_RESULTS = 100
+
+# Very common words can match a large share of all patients. Only the most
+# recent CANDIDATES matches are ranked, which keeps the cost bounded.
+CANDIDATES = 2000
+
+# bm25 weights for name, disease, phone, address
+RANK = "bm25(patients_fts, 10.0, 2.0, 5.0, 1.0)"
+
+PHONE = re.compile(r"^\+?\d{10,}$")
+
+
+def match_expression(text):
+    # Every word must match, each as a prefix: "ram fev" -> "ram"* AND "fev"*
+    words = re.findall(r"\w+", text)
+    return " AND ".join(f'"{w}"*' for w in words)
+
+
+def by_phone(phone, limit=20):
+    return query_all("SELECT * FROM patients WHERE phone = ? ORDER BY patient_id DESC LIMIT ?",
+                     (phone, max(1, min(limit, MAX_RESULTS))))
+
+
+def patients(text, limit=20):
+    text = (text or '').strip()
+    if PHONE.match(text):
+        rows = by_phone(text, limit)
+        if rows:
+            return rows
+    expression = match_expression(text)
+    if not expression:
+        return []
+    return query_all(f"""
+        SELECT p.* FROM (
+            SELECT rowid, {RANK} AS score FROM patients_fts
+            WHERE patients_fts MATCH ? ORDER BY rowid DESC LIMIT ?
+        ) f JOIN patients p ON p.patient_id = f.rowid
+        ORDER BY f.score LIMIT ?
+    """, (expression, CANDIDATES, max(1, min(limit, MAX_RESULTS))))
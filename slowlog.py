@@ -0,0 +1,115 @@
+import logging, os, re, sqlite3, sys, threading, time
+from flask import has_request_context, request
+
+# Slow-query log. The request cursor (db.Cursor) hands over any statement
+# that took longer than SLOW_QUERY_MS; we record where it came from, the
+# shape of its parameters (types only, never patient data) and its
+# EXPLAIN QUERY PLAN, and flag full-table scans. Entries are grouped per
+# statement text and kept per worker; /admin/slow-queries shows the worst.
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))   # negative turns it off
+THRESHOLD = SLOW_QUERY_MS / 1000 if SLOW_QUERY_MS >= 0 else float("inf")
+MAX_STATEMENTS = 200
+
+log = logging.getLogger("hospital.slow_query")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SKIP_FILES = {os.path.join(HERE, "db.py"), os.path.abspath(__file__)}
+
+_entries = {}
+_lock = threading.Lock()
+
+
+def normalize(sql):
+    sql = " ".join(sql.split())
+    # IN (?, ?, ?) lists of any length count as one statement
+    return re.sub(r"\bIN \(\?(?:, ?\?)+\)", "IN (?, ...)", sql, flags=re.I)
+
+
+def shape(params):
+    if params is None:
+        return "executemany"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+
+
+def caller():
+    # First frame in this project that isn't the db layer itself
+    frame = sys._getframe(2)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(HERE) and path not in SKIP_FILES:
+            return f"{os.path.relpath(path, HERE)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def explain(conn, sql, params):
+    if params is None:
+        return []
+    try:
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    except sqlite3.Error:
+        return []
+
+
+def bounded(sql, plan):
+    # ORDER BY <rowid> LIMIT n with nothing to filter on walks the table
+    # from one end and stops after n rows (latest patients, newest stock)
+    return (re.search(r"\bORDER BY\b", sql, re.I) and re.search(r"\bLIMIT\b", sql, re.I)
+            and not re.search(r"\b(WHERE|GROUP BY|HAVING)\b", sql, re.I)
+            and not any("TEMP B-TREE" in step for step in plan))
+
+
+def scans(sql, plan):
+    # "SCAN patients" walks the table itself (no index at all); SEARCH,
+    # index-ordered scans, virtual tables (FTS) and bounded rowid walks
+    # are left alone
+    if bounded(sql, plan):
+        return []
+    return [step for step in plan if re.fullmatch(r"SCAN \w+", step)]
+
+
+def ordered_scans(sql, plan):
+    if not bounded(sql, plan):
+        return []
+    return [step for step in plan if re.fullmatch(r"SCAN \w+", step)]
+
+
+def record(conn, sql, params, seconds):
+    route = request.endpoint if has_request_context() else None
+    where = caller()
+    plan = explain(conn, sql, params)
+    key = normalize(sql)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            if len(_entries) >= MAX_STATEMENTS:
+                del _entries[min(_entries, key=lambda k: _entries[k]["last_seen"])]
+            entry = _entries[key] = dict(sql=key, count=0, total=0.0, worst=0.0, routes={}, callers=set())
+        entry["count"] += 1
+        entry["total"] += seconds
+        entry["worst"] = max(entry["worst"], seconds)
+        entry["last_seen"] = time.time()
+        entry["shape"] = shape(params)
+        entry["plan"] = plan
+        entry["scans"] = scans(key, plan)
+        entry["ordered_scans"] = ordered_scans(key, plan)
+        entry["routes"][route or "-"] = entry["routes"].get(route or "-", 0) + 1
+        if where:
+            entry["callers"].add(where)
+    log.warning("slow query %.1fms route=%s at=%s params=%s plan=%s: %s",
+                seconds * 1000, route, where, shape(params), " | ".join(plan), key)
+
+
+def worst(limit=50):
+    with _lock:
+        entries = [dict(e, routes=dict(e["routes"]), callers=sorted(e["callers"])) for e in _entries.values()]
+    entries.sort(key=lambda e: e["total"], reverse=True)
+    return entries[:limit]
+
+
+def reset():
+    with _lock:
+        _entries.clear()
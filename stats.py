@@ -0,0 +1,48 @@
+from db import query_one
+
+# Single-row rollup kept current by triggers, so the dashboard never has to
+# COUNT(*) / SUM() over whole tables. Revenue is kept in whole paise so the
+# running total stays exact; divide by 100 to show it.
+COUNTERS = ('patients', 'doctors', 'nurses', 'medicines',
+            'occupied_beds', 'available_beds', 'bills', 'revenue_paise')
+
+FRESH_COUNTS = """
+SELECT 1,
+    (SELECT COUNT(*) FROM patients),
+    (SELECT COUNT(*) FROM doctors),
+    (SELECT COUNT(*) FROM nurses),
+    (SELECT COUNT(*) FROM medicines),
+    (SELECT COUNT(*) FROM facilities WHERE availability='occupied'),
+    (SELECT COUNT(*) FROM facilities WHERE availability='available'),
+    (SELECT COUNT(*) FROM bills),
+    (SELECT COALESCE(SUM(CAST(ROUND(total * 100) AS INTEGER)), 0) FROM bills)
+"""
+
+# Table and triggers: migrations.py (STATS_V1, STATS_PAISE).
+
+
+def current():
+    return dict(query_one("SELECT * FROM dashboard_stats WHERE id = 1"))
+
+
+def rebuild(conn):
+    # Recount everything from the base tables and return the counters that
+    # had drifted as {name: (stored, actual)}.
+    # All under the write lock, so no trigger update can land between the
+    # recount and the replace and be lost
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        stored = conn.execute("SELECT * FROM dashboard_stats WHERE id = 1").fetchone()
+        fresh = conn.execute(FRESH_COUNTS).fetchone()
+        conn.execute("INSERT OR REPLACE INTO dashboard_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", tuple(fresh))
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    drift = {}
+    for i, name in enumerate(COUNTERS, start=1):
+        old = stored[name] if stored else None
+        new = fresh[i]
+        if old != new:
+            drift[name] = (old, new)
+    return drift
@@ -0,0 +1,27 @@
+# Plain-text tables for the terminal program (hospital_PROJECT.py), laid out
+# the way pandas prints a DataFrame with a 1-based index, so the screens
+# look the same without loading pandas just to print a few small tables.
+#
+# pandas pads every number with a space for the sign and every text cell
+# with one leading space, then joins the columns with one more space.
+
+
+def _width(heading, values, numeric):
+    longest = max((len(v) for v in values), default=0)
+    if numeric:
+        return max(len(heading), longest) + 1
+    return max(len(heading), longest + 1)
+
+
+def render(columns, rows, start=1):
+    index = [str(n) for n in range(start, start + len(rows))]
+    left = max((len(n) for n in index), default=0)
+    cells = [[str(v) for v in row] for row in rows]
+    widths = []
+    for i, heading in enumerate(columns):
+        numeric = bool(rows) and all(isinstance(row[i], int) and not isinstance(row[i], bool) for row in rows)
+        widths.append(_width(heading, [row[i] for row in cells], numeric))
+    lines = [" " * left + "".join(" " + c.rjust(w) for c, w in zip(columns, widths))]
+    for n, row in zip(index, cells):
+        lines.append(n.ljust(left) + "".join(" " + v.rjust(w) for v, w in zip(row, widths)))
+    return "\n".join(lines)
@@ -0,0 +1,19 @@
+from db import query_all, query_one
+
+# Per-table change counters. Triggers bump a table's version on every
+# insert/update/delete, so any worker can tell whether its cached copy of
+# that table is stale with a single primary-key read.
+
+# Table and triggers: migrations.py (TABLE_VERSIONS_V1).
+
+
+def current(table):
+    row = query_one("SELECT version FROM table_versions WHERE name = ?", (table,))
+    return row["version"] if row else 0
+
+
+def many(tables):
+    rows = query_all(f"SELECT name, version FROM table_versions WHERE name IN ({', '.join('?' * len(tables))})",
+                     tuple(tables))
+    found = {r["name"]: r["version"] for r in rows}
+    return tuple(found.get(t, 0) for t in tables)